@@ -26,33 +26,105 @@
 # NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import os
 import shutil
-import sys
-import yaml
 
-from copy import deepcopy
-from datetime import datetime
+from datetime import datetime, timedelta
 from glob import glob
-from os.path import join, basename, getsize, isfile
-from subprocess import run
-from tempfile import mkdtemp
+from threading import Event, Thread
+from typing import Dict, List, Optional, Tuple
+from os.path import join, basename, dirname, isfile
 
 from ovos_bus_client import Message
 from neon_utils.user_utils import get_user_prefs
 from neon_utils.skills.neon_skill import NeonSkill
-from neon_utils.net_utils import get_ip_address
-from neon_utils.file_utils import encode_file_to_base64_string
-from neon_utils.parse_utils import validate_email
 from ovos_utils import classproperty
 from ovos_utils.log import LOG
 from ovos_utils.process_utils import RuntimeRequirements
 from ovos_workshop.decorators import intent_handler
 
+from .bundle import ARCHIVE_FORMATS, B64_CHUNK_SIZE, BUNDLE_SCOPES, \
+    Base64Attachment, allocate_budget, clean_stale_workspaces, \
+    create_workspace, write_archive
+from .collection import BackgroundJob, CoalescingCache
+from .delta import BUNDLE_MODES, DeltaState, get_file_hash, \
+    get_log_checkpoint
+from .error_index import ErrorIndex
+from .health_monitor import HealthMonitor
+from .log_compaction import compact_log
+from .log_utils import FileSegment, as_segment, find_rotated_logs, \
+    get_attachment_name, get_head_segment, get_tail_segment, \
+    get_time_window_segment, is_log_file
+from .outbox import MAX_ATTEMPTS, Outbox
+from .packages import PackageInventory
+from .pipeline import MEMORY_LIMIT, get_worker_count, map_ordered
+from .profiler import PROFILE_CANCEL, PROFILE_REQUEST, SAMPLE_RATE, \
+    ProfileResponder, request_profiles
+from .redaction import TEXT_PATTERNS, Redactor
+from .resource_sampler import ResourceSampler
+from .serialization import DIAGNOSTICS_FORMATS, write_diagnostics
+from .service_status import SERVICE_READY_MESSAGES, probe_services
+from .skill_registry import SkillRegistry
+
 
 class SupportSkill(NeonSkill):
     def __init__(self, **kwargs):
+        # Referenced in `initialize`, which is called by `NeonSkill.__init__`
+        self._outbox = None
+        self._delta_state = None
+        self._skill_registry = SkillRegistry()
+        self._health_monitor = HealthMonitor()
+        self._resource_sampler = None
+        self._error_index = None
+        self._error_index_build: Optional[Thread] = None
         NeonSkill.__init__(self, **kwargs)
         self.extra_diagnostic_files = ['/opt/neon/build_info.json']
+        self._package_inventory = PackageInventory()
+        # Shared between support requests made within `collection_ttl`
+        self._collection_cache = CoalescingCache(self.collection_ttl,
+                                                 self._remove_shared_files)
+
+    def initialize(self):
+        super().initialize()
+        # Remove any bundles left behind by a previous crash
+        clean_stale_workspaces()
+        self.outbox.start()
+        self.add_event("neon.support.outbox", self.handle_outbox_status)
+        self.add_event("neon.support.generate_bundle",
+                       self.handle_generate_bundle)
+        # Track loaded skills so reports don't wait on the skill manager
+        self.add_event("mycroft.skills.list",
+                       self._skill_registry.handle_skill_list)
+        self.add_event("mycroft.skills.loaded",
+                       self._skill_registry.handle_skill_loaded)
+        self.add_event("mycroft.skills.loading_failure",
+                       self._skill_registry.handle_skill_failure)
+        self.add_event("mycroft.skills.shutdown",
+                       self._skill_registry.handle_skill_shutdown)
+        self.bus.emit(Message("skillmanager.list"))
+        # Record service status whenever any client checks readiness
+        for service, msg_type in SERVICE_READY_MESSAGES.items():
+            self.add_event(f"{msg_type}.response",
+                           self._get_status_handler(service))
+        if self.health_monitor_interval:
+            self.schedule_repeating_event(self._monitor_health, None,
+                                          self.health_monitor_interval,
+                                          name="monitor_health")
+        if self.resource_sample_interval:
+            self.resource_sampler.start()
+        # This skill profiles the skills service when requested
+        profile_responder = ProfileResponder("skills", self.bus)
+        self.add_event(PROFILE_REQUEST, profile_responder.handle_request)
+        self.add_event(PROFILE_CANCEL, profile_responder.handle_cancel)
+        if self.error_index_interval:
+            # The first scheduled update is a full interval away; build the
+            # index now so the first support request doesn't have to
+            self._error_index_build = Thread(target=self._update_error_index,
+                                             daemon=True)
+            self._error_index_build.start()
+            self.schedule_repeating_event(self._update_error_index, None,
+                                          self.error_index_interval,
+                                          name="update_error_index")
 
     @classproperty
     def runtime_requirements(self):
@@ -73,6 +145,261 @@ class SupportSkill(NeonSkill):
         """
         return self.settings.get("support_email") or "support@neon.ai"
 
+    @property
+    def status_timeout(self) -> float:
+        """
+        Seconds to wait for all services to report their status
+        """
+        return float(self.settings.get("status_timeout") or 3)
+
+    @property
+    def bundle_format(self) -> str:
+        """
+        Format to attach diagnostics in; `raw` for individual files or one of
+        `tar.gz`, `zip` for a single compressed archive
+        """
+        return self.settings.get("bundle_format") or "raw"
+
+    @property
+    def compression_level(self) -> int:
+        """
+        Compression level (0-9) for archived bundles
+        """
+        return int(self.settings.get("compression_level", 6))
+
+    @property
+    def log_window_minutes(self) -> Optional[float]:
+        """
+        If set, only include log entries from this many minutes around the
+        time of the support request (see `log_window_mode`)
+        """
+        minutes = self.settings.get("log_window_minutes")
+        return float(minutes) if minutes else None
+
+    @property
+    def log_window_mode(self) -> str:
+        """
+        `recent` to include logs from the last `log_window_minutes`, or
+        `utterance` to include logs from `log_window_minutes` before and after
+        the utterance time in the request context
+        """
+        return self.settings.get("log_window_mode") or "recent"
+
+    @property
+    def include_rotated_logs(self) -> bool:
+        """
+        If True, include rotated (i.e. `skills.log.1`, `skills.log.2.gz`) logs
+        as budget allows
+        """
+        return bool(self.settings.get("include_rotated_logs", True))
+
+    @property
+    def compact_logs(self) -> bool:
+        """
+        If True, collapse repeated log entries and tracebacks in attachments
+        """
+        return bool(self.settings.get("compact_logs"))
+
+    @property
+    def redact(self) -> bool:
+        """
+        If True, remove tokens, keys, email addresses and locations from
+        attachments
+        """
+        return bool(self.settings.get("redact", True))
+
+    @property
+    def redact_patterns(self) -> dict:
+        """
+        Additional patterns of sensitive text to redact, as a dict of names
+        to regular expressions. A `value` group limits redaction to part of
+        a match.
+        """
+        return self.settings.get("redact_patterns") or dict()
+
+    @property
+    def redactor(self) -> Optional[Redactor]:
+        """
+        Redactor applied to attachments, None if `redact` is disabled
+        """
+        if not self.redact:
+            return None
+        if self.redact_patterns:
+            return Redactor({**TEXT_PATTERNS, **self.redact_patterns})
+        return Redactor()
+
+    @property
+    def attachment_workers(self) -> int:
+        """
+        Number of attachment files to process concurrently; 0 for one per
+        CPU (up to 4). Always 1 on single-core hardware.
+        """
+        return get_worker_count(int(self.settings.get("attachment_workers",
+                                                      0)))
+
+    @property
+    def memory_limit(self) -> int:
+        """
+        Ceiling in bytes on the estimated memory of attachments being encoded
+        concurrently
+        """
+        return int(self.settings.get("memory_limit") or MEMORY_LIMIT)
+
+    @property
+    def diagnostics_format(self) -> str:
+        """
+        Format of diagnostics.txt and core_config.txt; "yaml", or "jsonl" for
+        compact JSON with one top-level key per line
+        """
+        fmt = self.settings.get("diagnostics_format") or "yaml"
+        if fmt not in DIAGNOSTICS_FORMATS:
+            LOG.warning(f"Invalid diagnostics_format: {fmt}")
+            fmt = "yaml"
+        return fmt
+
+    @property
+    def error_index_interval(self) -> int:
+        """
+        Seconds between background updates of the log error index; 0 to only
+        update it when a support request is made
+        """
+        return int(self.settings.get("error_index_interval", 3600))
+
+    @property
+    def health_monitor_interval(self) -> int:
+        """
+        Seconds between background checks of service readiness; 0 to only
+        record status observed on the messagebus and at support requests
+        """
+        return int(self.settings.get("health_monitor_interval", 0))
+
+    @property
+    def health_history_hours(self) -> float:
+        """
+        Number of hours of service health history to include in diagnostics
+        """
+        return float(self.settings.get("health_history_hours", 24))
+
+    @property
+    def resource_sample_interval(self) -> float:
+        """
+        Seconds between background samples of system and service resource
+        use; 0 to only sample when a support request is made
+        """
+        return float(self.settings.get("resource_sample_interval", 10))
+
+    @property
+    def resource_sampler(self) -> ResourceSampler:
+        """
+        Record of recent system and service resource use
+        """
+        if not self._resource_sampler:
+            self._resource_sampler = ResourceSampler(
+                LOG.base_path, self.resource_sample_interval or 10)
+        return self._resource_sampler
+
+    @property
+    def profile_seconds(self) -> float:
+        """
+        Seconds to sample service stacks for while collecting diagnostics;
+        0 to not attach profiles
+        """
+        return float(self.settings.get("profile_seconds", 5))
+
+    @property
+    def profile_rate(self) -> float:
+        """
+        Stack samples per second when profiling services
+        """
+        return float(self.settings.get("profile_rate") or SAMPLE_RATE)
+
+    @property
+    def profile_services(self) -> list:
+        """
+        Names of services to request profiles from
+        """
+        return self.settings.get("profile_services") or ["skills"]
+
+    @property
+    def error_index(self) -> ErrorIndex:
+        """
+        Persistent index of errors in service logs
+        """
+        if not self._error_index:
+            self._error_index = ErrorIndex(join(self.file_system.path,
+                                                "error_index.json"))
+        return self._error_index
+
+    @property
+    def bundle_mode(self) -> str:
+        """
+        "full" to always attach complete diagnostics, or "delta" to attach
+        only log data written and files changed since the last delivered
+        support email (a full bundle is sent if logs were rotated)
+        """
+        mode = self.settings.get("bundle_mode") or "full"
+        if mode not in BUNDLE_MODES:
+            LOG.warning(f"Invalid bundle_mode: {mode}")
+            mode = "full"
+        return mode
+
+    @property
+    def delta_state(self) -> DeltaState:
+        """
+        Persistent record of the last delivered support bundle
+        """
+        if not self._delta_state:
+            self._delta_state = DeltaState(join(self.file_system.path,
+                                                "bundle_state.json"))
+        return self._delta_state
+
+    @property
+    def collection_ttl(self) -> float:
+        """
+        Seconds to reuse collected diagnostics for subsequent support
+        requests. Concurrent requests always share one collection.
+        """
+        return float(self.settings.get("collection_ttl", 60))
+
+    @property
+    def email_max_attempts(self) -> int:
+        """
+        Number of attempts to deliver a support email with attachments before
+        sending it without attachments
+        """
+        return int(self.settings.get("email_max_attempts") or MAX_ATTEMPTS)
+
+    @property
+    def outbox(self) -> Outbox:
+        """
+        Persistent queue of support emails pending delivery
+        """
+        if not self._outbox:
+            self._outbox = Outbox(join(self.file_system.path, "outbox"),
+                                  self._send_queued_email,
+                                  self.email_max_attempts,
+                                  on_delivered=self.delta_state.commit)
+        return self._outbox
+
+    @property
+    def bundle_budget(self) -> int:
+        """
+        Maximum total size in bytes of encoded attachments, shared between
+        log files by priority. 0 to limit each log to `max_log_bytes` instead
+        """
+        return int(self.settings.get("bundle_budget", 8000000))
+
+    @property
+    def max_log_bytes(self) -> int:
+        """
+        Maximum number of bytes to include from each log file when no
+        `bundle_budget` is set. Defaults to more history when logs are
+        compressed into an archive
+        """
+        default = 10000000 if self.bundle_format in ARCHIVE_FORMATS \
+            else 1000000
+        return int(self.settings.get("max_log_bytes") or default)
+
     @intent_handler('contact_support.intent')
     def handle_contact_support(self, message: Message):
         """
@@ -80,6 +407,27 @@ class SupportSkill(NeonSkill):
         :param message: Message associated with request
         """
         user_profile = get_user_prefs(message)
+        clean_stale_workspaces()
+        workspace = create_workspace()
+        # Collect diagnostics while waiting on user responses
+        collection = BackgroundJob(self._collect_diagnostics, message,
+                                   user_profile, workspace=workspace)
+        try:
+            self._contact_support(message, user_profile, collection)
+        finally:
+            collection.cancel()
+            shutil.rmtree(workspace, ignore_errors=True)
+
+    def _contact_support(self, message: Message, user_profile: dict,
+                         collection: BackgroundJob):
+        """
+        Confirm a support request with the user and send the support email
+        :param message: Message associated with request
+        :param user_profile: user profile associated with request
+        :param collection: BackgroundJob collecting diagnostics
+        """
+        # Imported here since parse_utils is slow to import
+        from neon_utils.parse_utils import validate_email
         email_addr = user_profile["user"]["email"]
         if not validate_email(email_addr):
             self.speak_dialog("no_email", private=True)
@@ -88,60 +436,374 @@ class SupportSkill(NeonSkill):
                           {"email": email_addr}) == "yes":
             if user_profile["response_mode"].get("hesitation"):
                 self.speak_dialog("one_moment", private=True)
-            diagnostic_info = self._get_support_info(message, user_profile)
             user_description = self.get_response("ask_description",
                                                  num_retries=0)
+            diagnostic_info, files = collection.result()
             diagnostic_info["user_description"] = user_description
-            attachment_files = self._parse_attachments(
-                self._get_attachments(diagnostic_info))
-            if self.send_email(self.resources.render_dialog("email_title"),
-                               self._format_email_body(diagnostic_info),
-                               message, email_addr,
-                               attachments=attachment_files):
-                self.speak_dialog("complete",
-                                  {"email": email_addr},
-                                  private=True)
-                return
-            LOG.error("Email failed to send, retry without attachments")
-            if self.send_email(self.resources.render_dialog("email_title"),
-                               self._format_email_body(diagnostic_info),
-                               message, email_addr):
-                self.speak_dialog("complete",
-                                  {"email": email_addr},
-                                  private=True)
-            else:
-                LOG.error(f"Email Failed to send!")
+            self._update_diagnostics(files, diagnostic_info)
+            attachment_files = self._build_attachments(
+                files, diagnostic_info.get("log_compaction"))
+            try:
+                # Deliver in the background, retrying if sending fails
+                self.outbox.enqueue(
+                    self.resources.render_dialog("email_title"),
+                    self._format_email_body(diagnostic_info), email_addr,
+                    attachment_files, diagnostic_info.get("bundle"))
+            except Exception as e:
+                LOG.exception(f"Failed to queue email: {e}")
                 self.speak_dialog("email_error", private=True)
+                return
+            self.speak_dialog("complete", {"email": email_addr},
+                              private=True)
         else:
+            collection.cancel()
             self.speak_dialog("cancelled", private=True)
 
+    def handle_outbox_status(self, message: Message):
+        """
+        Handle a request for the status of queued support emails
+        :param message: Message requesting outbox status
+        """
+        self.bus.emit(message.response(self.outbox.get_metrics()))
+
+    def handle_generate_bundle(self, message: Message):
+        """
+        Handle a request to generate a diagnostic bundle without user
+        interaction. Request data may specify:
+          `scopes`: list of `BUNDLE_SCOPES` to include (default all)
+          `format`: one of `ARCHIVE_FORMATS` (default `bundle_format` if it is
+            an archive format, else tar.gz)
+          `output`: "path" to reply with the path to the bundle or "chunks" to
+            stream the B64-encoded bundle in `.chunk` replies (default path)
+          `chunk_size`: number of raw bytes per chunk
+        The response includes the bundle manifest and `path`, or `chunks`
+        with the number of chunks sent. A bundle returned by path is removed
+        after `STALE_WORKSPACE_AGE`.
+        :param message: Message requesting a bundle
+        """
+        # Bundles returned by path are removed by later requests
+        clean_stale_workspaces()
+        scopes = message.data.get("scopes") or BUNDLE_SCOPES
+        archive_format = message.data.get("format") or \
+            (self.bundle_format if self.bundle_format in ARCHIVE_FORMATS
+             else ARCHIVE_FORMATS[0])
+        output = message.data.get("output") or "path"
+        chunk_size = message.data.get("chunk_size") or B64_CHUNK_SIZE
+        invalid = [s for s in scopes if s not in BUNDLE_SCOPES]
+        if invalid or archive_format not in ARCHIVE_FORMATS or \
+                output not in ("path", "chunks"):
+            error = f"Invalid request: {message.data}"
+            LOG.warning(error)
+            self.bus.emit(message.response({"error": error}))
+            return
+        workspace = create_workspace()
+        try:
+            info = self._get_support_info(message, scopes=scopes)
+            files = self._get_attachments(info, workspace, scopes)
+            manifest_info = {"scopes": list(scopes)}
+            if info.get("log_compaction"):
+                manifest_info["log_compaction"] = info["log_compaction"]
+            archive_file, manifest = self._create_archive(
+                files, archive_format, self.compression_level,
+                self.max_log_bytes,
+                self._get_attachment_limits(files, archive_format),
+                workspace, manifest_info)
+            response = {"manifest": manifest}
+            if output == "path":
+                response["path"] = archive_file
+            else:
+                attachment = Base64Attachment(FileSegment(archive_file),
+                                              chunk_size)
+                index = 0
+                for index, chunk in enumerate(attachment):
+                    self.bus.emit(message.reply(
+                        f"{message.msg_type}.chunk",
+                        {"index": index, "data": chunk,
+                         "name": basename(archive_file)}))
+                response["chunks"] = index + 1
+                shutil.rmtree(workspace, ignore_errors=True)
+        except Exception as e:
+            LOG.exception(f"Failed to generate bundle: {e}")
+            shutil.rmtree(workspace, ignore_errors=True)
+            response = {"error": repr(e)}
+        self.bus.emit(message.response(response))
+
+    def _send_queued_email(self, title: str, body: str, email_addr: str,
+                           attachments: dict = None) -> bool:
+        """
+        Send an email from the outbox
+        :returns: True if the email was sent
+        """
+        return self.send_email(title, body, email_addr=email_addr,
+                               attachments=attachments)
+
+    def _collect_diagnostics(self, message: Message, profile: dict,
+                             cancelled: Event,
+                             workspace: str = None) -> Optional[tuple]:
+        """
+        Collect diagnostic information and attachment files for a support
+        ticket. Intended to run in a `BackgroundJob`.
+        :param message: Message associated with support request
+        :param profile: user profile associated with support request
+        :param cancelled: Event set when the support request is cancelled
+        :param workspace: directory to write attachment files to (default new
+            temporary directory)
+        :returns: tuple of diagnostic info and attachment files, or None if
+            cancelled before completion
+        """
+        # Profile services while the rest of the diagnostics are collected
+        profiling = BackgroundJob(self._capture_profiles, message,
+                                  cancelled=cancelled) \
+            if self.profile_seconds else None
+        diagnostic_info = self._get_support_info(message, profile)
+        if cancelled.is_set():
+            LOG.debug("Collection cancelled")
+            return None
+        files = self._get_attachments(diagnostic_info, workspace,
+                                      delta=self.bundle_mode == "delta")
+        if profiling:
+            self._attach_profiles(profiling.result(), files, diagnostic_info)
+        if cancelled.is_set():
+            LOG.debug("Collection cancelled, removing attachments")
+            shutil.rmtree(dirname(files[-1]), ignore_errors=True)
+            return None
+        return diagnostic_info, files
+
+    def _capture_profiles(self, message: Message,
+                          cancelled: Event) -> dict:
+        """
+        Request stack profiles from `profile_services`. Profiles are shared
+        with other requests made within `collection_ttl`. Intended to run in
+        a `BackgroundJob`.
+        :param message: Message associated with support request
+        :param cancelled: Event set when the support request is cancelled;
+            services are asked to stop sampling and no profiles are returned
+        :returns: dict of service names to profile responses
+        """
+        services = tuple(sorted(self.profile_services))
+
+        def _request_profiles():
+            profiles = request_profiles(self.bus, message, services,
+                                        self.profile_seconds,
+                                        self.profile_rate,
+                                        self.status_timeout, cancelled)
+            if cancelled.is_set():
+                # Don't share profiles that were cut short
+                raise InterruptedError("Profiling cancelled")
+            return profiles
+
+        while True:
+            try:
+                profiles = self._collection_cache.get(
+                    ("profiles", services, self.profile_seconds,
+                     self.profile_rate), _request_profiles)
+                break
+            except InterruptedError:
+                if cancelled.is_set():
+                    LOG.debug("Profiling cancelled")
+                    return dict()
+                # Profiling shared with a cancelled request; try again
+        missing = set(self.profile_services) - set(profiles)
+        if missing:
+            LOG.warning(f"No profile response from: {missing}")
+        return profiles
+
+    def _attach_profiles(self, profiles: dict, files: list, info: dict):
+        """
+        Write collapsed stack profiles alongside `diagnostics.txt` and add a
+        summary of each profile to diagnostics
+        :param profiles: dict of service names to profile responses
+        :param files: list of attachment files ending with `diagnostics.txt`
+        :param info: diagnostic information to update
+        """
+        info["profiles"] = dict()
+        for service, profile in sorted(profiles.items()):
+            info["profiles"][service] = {
+                key: value for key, value in profile.items()
+                if key not in ("collapsed", "request_id")}
+            collapsed = profile.get("collapsed")
+            if not collapsed:
+                continue
+            profile_file = join(dirname(files[-1]), f"profile_{service}.txt")
+            with open(profile_file, 'w') as f:
+                f.write(collapsed)
+            files.insert(-1, profile_file)
+        self._update_diagnostics(files, info)
+
+    def _build_attachments(self, files: list,
+                           log_compaction: dict = None) -> dict:
+        """
+        Build email attachments from a list of files, either individually or
+        as a single compressed archive according to `bundle_format`. If a
+        `bundle_budget` is configured, it is allocated between log files and
+        all other files are included in full.
+        :param files: list of files to include as attachments
+        :param log_compaction: optional log compaction statistics to include
+            in an archive manifest
+        :returns: dict of attachment filenames to B64 contents
+        """
+        limits = self._get_attachment_limits(files, self.bundle_format)
+        if self.bundle_format in ARCHIVE_FORMATS:
+            return self._archive_attachments(files, self.bundle_format,
+                                             self.compression_level,
+                                             self.max_log_bytes, limits,
+                                             dirname(files[-1]),
+                                             log_compaction)
+        return self._parse_attachments(files, self.max_log_bytes,
+                                       limits=limits,
+                                       workers=self.attachment_workers,
+                                       memory_limit=self.memory_limit)
+
+    def _get_attachment_limits(self, files: list,
+                               bundle_format: str) -> Optional[dict]:
+        """
+        Allocate `bundle_budget` between log files
+        :param files: list of files or FileSegments to be attached
+        :param bundle_format: format the files will be attached in
+        :returns: dict of files to the number of bytes to include, None if no
+            budget is configured
+        """
+        if not self.bundle_budget:
+            return None
+        log_files = [f for f in files if is_log_file(as_segment(f).path)]
+        limits = allocate_budget(
+            log_files, [f for f in files if f not in log_files],
+            self.bundle_budget, self.compression_level
+            if bundle_format in ARCHIVE_FORMATS else None)
+        LOG.debug(f"Allocated attachment sizes: {limits}")
+        return limits
+
+    @staticmethod
+    def _archive_attachments(files: list, archive_format: str = "tar.gz",
+                             compression_level: int = 6,
+                             max_log_bytes: int = 10000000,
+                             limits: dict = None,
+                             output_dir: str = None,
+                             log_compaction: dict = None) -> dict:
+        """
+        Compress a list of files into a single archive attachment. Files
+        exceeding `max_log_bytes` are truncated to their last complete lines
+        and the archive manifest records where each file was truncated.
+        Compressed (rotated) logs are stored decompressed in the archive.
+        :param files: list of files or FileSegments to include in the archive
+        :param archive_format: one of `ARCHIVE_FORMATS`
+        :param compression_level: compression level 0-9
+        :param max_log_bytes: maximum number of bytes to include per file
+        :param limits: optional dict of files to the number of bytes to
+            include, overriding `max_log_bytes`; files limited to 0 are omitted
+        :param output_dir: directory to write the archive to (default new
+            temporary directory, removed once the archive is encoded)
+        :param log_compaction: optional log compaction statistics to include
+            in the manifest
+        :returns: dict of archive filename to B64 contents
+        """
+        if not files:
+            return {}
+        workspace = None if output_dir else create_workspace()
+        try:
+            archive_file, _ = SupportSkill._create_archive(
+                files, archive_format, compression_level, max_log_bytes,
+                limits, output_dir or workspace,
+                {"log_compaction": log_compaction} if log_compaction else None)
+            return {basename(archive_file):
+                    Base64Attachment(FileSegment(archive_file)).to_string()}
+        finally:
+            if workspace:
+                shutil.rmtree(workspace, ignore_errors=True)
+
+    @staticmethod
+    def _create_archive(files: list, archive_format: str,
+                        compression_level: int, max_log_bytes: int,
+                        limits: Optional[dict], output_dir: str,
+                        manifest_info: dict = None) -> Tuple[str, dict]:
+        """
+        Write a list of files to an archive, truncating files to their
+        `limits` or `max_log_bytes`
+        :param files: list of files or FileSegments to include in the archive
+        :param archive_format: one of `ARCHIVE_FORMATS`
+        :param compression_level: compression level 0-9
+        :param max_log_bytes: maximum number of bytes to include per file
+        :param limits: optional dict of files to the number of bytes to
+            include, overriding `max_log_bytes`; files limited to 0 are omitted
+        :param output_dir: directory to write the archive to
+        :param manifest_info: optional additional data to include in the
+            manifest
+        :returns: path to the archive and its manifest
+        """
+        limits = limits or {}
+        segments = {}
+        for file in map(as_segment, files):
+            try:
+                max_bytes = limits.get(file.path, max_log_bytes)
+                if not max_bytes:
+                    LOG.info(f"No space for {file.path} in bundle")
+                    continue
+                name = basename(file.path)
+                if name.endswith('.gz'):
+                    name = name[:-len('.gz')]
+                segments[name] = get_tail_segment(file, max_bytes)
+            except Exception as e:
+                LOG.exception(e)
+        archive_file = join(output_dir, f"support_bundle.{archive_format}")
+        manifest = write_archive(segments, archive_file, archive_format,
+                                 compression_level, manifest_info)
+        LOG.info(f"Compressed {manifest['included_size']}B of "
+                 f"{manifest['original_size']}B to "
+                 f"{manifest['archive_size']}B")
+        return archive_file, manifest
+
     @staticmethod
-    def _parse_attachments(files: list) -> dict:
+    def _parse_attachments(files: list, max_log_bytes: int = 1000000,
+                           stream: bool = False, limits: dict = None,
+                           workers: int = 1,
+                           memory_limit: int = MEMORY_LIMIT) -> dict:
         """
         Parse a list of files into a dict of filenames to B64 contents.
-        Truncates log files to 50000 lines if they exceed 1MB as an arbitrary
-        limit that should safely keep all attachments within email provider
-        limits (~10MB-50MB).
-        :param files: list of files to include as attachments
+        Files exceeding `max_log_bytes` (1MB by default, an arbitrary limit
+        that should safely keep all attachments within email provider limits
+        of ~10MB-50MB) are truncated to their last complete lines within that
+        limit. Input files are never modified and compressed (rotated) logs are
+        decompressed as they are encoded.
+        :param files: list of files or FileSegments to include as attachments
+        :param max_log_bytes: maximum number of bytes to include per file
+        :param stream: if True, return `Base64Attachment` objects that encode
+            on demand instead of B64 strings
+        :param limits: optional dict of files to the number of bytes to
+            include, overriding `max_log_bytes`; files limited to 0 are omitted
+        :param workers: number of files to encode concurrently
+        :param memory_limit: ceiling on the estimated memory of files being
+            encoded concurrently
+        :returns: dict of attachment names to contents, in the order of
+            `files`
         """
-        attachments = {}
-        for file in files:
+        limits = limits or {}
+
+        def _parse_file(file: FileSegment) -> Optional[tuple]:
             try:
-                byte_size = getsize(file)
-                if byte_size > 1000000:
-                    LOG.info(f"{file} is >1MB, truncating")
-                    with open(file, 'rb+') as f:
-                        content = f.read()
-                        trunc = content[-1000000:].split(b'\n', 1)[1]
-                        f.seek(0)
-                        f.write(trunc)
-                        f.truncate()
-                LOG.debug(f"{file} is {getsize(file)/1024/1024} MiB")
-                attachments[basename(file).replace('.log', '_log.txt')] = \
-                    encode_file_to_base64_string(file)
+                max_bytes = limits.get(file.path, max_log_bytes)
+                if not max_bytes:
+                    LOG.info(f"No space for {file.path} in attachments")
+                    return None
+                segment = get_tail_segment(file, max_bytes)
+                if segment.start > file.start:
+                    LOG.info(f"{file.path} is >{max_bytes}B, truncating")
+                LOG.debug(f"{file.path} is {segment.size/1024/1024} MiB")
+                attachment = Base64Attachment(segment)
+                return get_attachment_name(file.path), \
+                    attachment if stream else attachment.to_string()
             except Exception as e:
                 LOG.exception(e)
-        return attachments
+                return None
+
+        def _get_encode_size(file: FileSegment) -> int:
+            # Encoded chunks and the joined string are each 4/3 of the input
+            return 3 * min(file.size, limits.get(file.path, max_log_bytes))
+
+        # Streamed attachments are encoded later, by the consumer
+        parsed = map_ordered(_parse_file, list(map(as_segment, files)),
+                             1 if stream else workers, memory_limit,
+                             _get_encode_size)
+        return dict(result for result in parsed if result)
 
     def _format_email_body(self, diagnostics: dict) -> str:
         """
@@ -155,132 +817,480 @@ class SupportSkill(NeonSkill):
                             "No Description Provided",
                             self.resources.render_dialog("email_signature")))
 
-    def _check_service_status(self, message: Message = None) -> dict:
+    def _probe_services(self, message: Message = None) -> dict:
         """
-        Query services on the messagebus and report back their status
+        Query all services on the messagebus concurrently and report their
+        status, state (`ready`, `not_ready`, `timeout`) and response latency
         """
         message = message or Message("get_status")
+        probe = probe_services(self.bus, message, timeout=self.status_timeout)
+        timed_out = [name for name, result in probe.items()
+                     if result["state"] == "timeout"]
+        if timed_out:
+            LOG.warning(f"No status response from: {timed_out}")
+        LOG.debug(f"Service probe: {probe}")
+        return probe
 
-        speech_module = self.bus.wait_for_response(
-            message.forward("mycroft.speech.is_ready"))
-        speech_status = speech_module.data.get("status") if speech_module \
-            else None
-
-        voice_module = self.bus.wait_for_response(
-            message.forward("mycroft.voice.is_ready"))
-        voice_status = voice_module.data.get("status") if voice_module \
-            else None
-
-        audio_module = self.bus.wait_for_response(
-            message.forward("mycroft.audio.is_ready"))
-        audio_status = audio_module.data.get("status") if audio_module \
-            else None
-
-        skills_module = self.bus.wait_for_response(
-            message.forward("mycroft.skills.is_ready"))
-        skills_status = skills_module.data.get("status") if skills_module \
-            else None
-
-        gui_module = self.bus.wait_for_response(
-            message.forward("mycroft.gui_service.is_ready"))
-        gui_status = gui_module.data.get("status") if gui_module \
-            else None
-
-        phal_module = self.bus.wait_for_response(
-            message.forward("mycroft.PHAL.is_ready")
-        )
-        enclosure_status = phal_module.data.get("status") if phal_module \
-            else None
-
-        admin_module = self.bus.wait_for_response(
-            message.forward("mycroft.PHAL.admin.is_ready")
-        )
-        admin_status = admin_module.data.get("status") if admin_module \
-            else None
-
-        return {"speech": speech_status,
-                "voice": voice_status,
-                "audio": audio_status,
-                "skills": skills_status,
-                "gui": gui_status,
-                "enclosure": enclosure_status,
-                "admin": admin_status}
+    def _check_service_status(self, message: Message = None,
+                              probe: dict = None) -> dict:
+        """
+        Query services on the messagebus and report back their status
+        :param message: Message associated with request
+        :param probe: optional result of `_probe_services` to report from
+        """
+        probe = probe or self._probe_services(message)
+        return {name: result["status"] for name, result in probe.items()}
+
+    def _get_log_window(self, context: dict = None) -> \
+            Optional[Tuple[datetime, datetime]]:
+        """
+        Get the time window of log entries to include in attachments
+        :param context: Message context of the support request
+        :returns: tuple of (start, end) local times, None to include all logs
+        """
+        if not self.log_window_minutes:
+            return None
+        window = timedelta(minutes=self.log_window_minutes)
+        if self.log_window_mode == "utterance":
+            timing = (context or {}).get("timing") or {}
+            # Timing may also contain durations; only consider epoch times
+            timestamps = [t for t in timing.values()
+                          if isinstance(t, (int, float)) and t > 1000000000]
+            if timestamps:
+                utterance_time = datetime.fromtimestamp(min(timestamps))
+                return utterance_time - window, utterance_time + window
+            LOG.warning("No utterance time in context, using recent logs")
+        now = datetime.now()
+        return now - window, now
+
+    def _get_status_handler(self, service: str):
+        """
+        Get a handler that records a service's readiness responses
+        :param service: name of the service responding
+        """
+        def handler(message: Message):
+            state = "ready" if message.data.get("status") else "not_ready"
+            self._health_monitor.record(service, state)
+        return handler
+
+    def _monitor_health(self, message: Message = None):
+        """
+        Probe services and record their status in the health monitor
+        :param message: Message associated with scheduled event
+        """
+        self._health_monitor.record_probe(self._probe_services())
+
+    def _update_error_index(self, message: Message = None):
+        """
+        Index errors logged since the last update and save the index
+        :param message: Message associated with scheduled event
+        """
+        LOG.debug(f"Indexed {self.error_index.update(self._get_log_files())}B"
+                  f" of new logs")
+        self.error_index.save()
 
     @staticmethod
-    def _get_log_files():
+    def _get_log_files(include_rotated: bool = False) -> list:
+        """
+        Get log files in the configured log directory
+        :param include_rotated: if True, include rotated logs, each listed
+            newest first after its active log
+        :returns: list of log file paths
+        """
         log_path = LOG.base_path
         log_files = glob(join(log_path, "*.log"))
+        if include_rotated:
+            log_files = [file for log_file in log_files
+                         for file in [log_file,
+                                      *find_rotated_logs(log_file)]]
         LOG.info(f"Found log files: {log_files}")
         return log_files
 
-    def _get_support_info(self, message: Message,
-                          profile: dict = None) -> dict:
+    def _get_support_info(self, message: Message, profile: dict = None,
+                          scopes: tuple = BUNDLE_SCOPES) -> dict:
         """
-        Collect relevant information to include in a support ticket
+        Collect relevant information to include in a support ticket. System
+        information is shared with other requests made within
+        `collection_ttl`.
         :param message: Message associated with support request
+        :param profile: user profile associated with support request
+        :param scopes: `BUNDLE_SCOPES` to collect information for
         """
         user_profile = profile or get_user_prefs(message)
-        message_context = deepcopy(message.context)
+        # Emitting responses adds keys to the context, so snapshot its keys;
+        # nested values are only read during serialization, not copied
+        info = {"user_profile": user_profile,
+                "message_context": dict(message.context)}
+        info.update(self._collection_cache.get(
+            ("info", tuple(sorted(scopes))),
+            lambda: self._collect_system_info(message, scopes)))
+        return info
 
-        loaded_skills = self.bus.wait_for_response(
-            message.forward("skillmanager.list"), "mycroft.skills.list"
-        )
-        loaded_skills = loaded_skills.data if loaded_skills else None
+    def _collect_system_info(self, message: Message, scopes: tuple) -> dict:
+        """
+        Collect information about the system that is not specific to a user
+        :param message: Message associated with support request
+        :param scopes: `BUNDLE_SCOPES` to collect information for
+        """
+        info = dict()
+        if "status" in scopes:
+            if not self._skill_registry.listed:
+                # Request skills loaded before this skill for future reports
+                self.bus.emit(message.forward("skillmanager.list"))
+            module_probe = self._probe_services(message)
+            info["module_status"] = self._check_service_status(message,
+                                                               module_probe)
+            info["module_probe"] = module_probe
+            self._health_monitor.record_probe(module_probe)
+            info["service_health"] = self._health_monitor.get_report(
+                self.health_history_hours)
+            self.resource_sampler.sample()
+            info["resources"] = self.resource_sampler.get_report()
+            info["loaded_skills"] = self._skill_registry.get_skill_list()
+            info["skill_registry"] = self._skill_registry.as_dict()
+        if "packages" in scopes:
+            info["packages"] = self._package_inventory.format_pip_list()
+            info["package_versions"] = self._package_inventory.as_dict()
+        if "logs" in scopes:
+            self._update_error_index()
+            info["error_summary"] = self.error_index.get_summary()
 
+        from neon_utils.net_utils import get_ip_address
         core_device_ip = get_ip_address()
-        packages = run([sys.executable, "-m", "pip", "list"],
-                       capture_output=True).stdout.decode()
-        return {
-            "user_profile": user_profile,
-            "message_context": message_context,
-            "module_status": self._check_service_status(message),
-            "loaded_skills": loaded_skills,
-            "packages": packages,
-            "host_device": {"ip": core_device_ip},
-            "generated_time_utc": datetime.utcnow().isoformat()
-        }
-
-    def _get_attachments(self, info: dict) -> list:
-        """
-        Parse dict information into attachment files for a support email
+        info["host_device"] = {"ip": core_device_ip}
+        info["generated_time_utc"] = datetime.utcnow().isoformat()
+        return info
+
+    def _get_snapshot_limits(self, sources: List[FileSegment],
+                             required_files: list) -> Dict[str, int]:
+        """
+        Get the most bytes of each log that could be attached, so that only
+        the tail of each log that may be sent is copied
+        :param sources: FileSegments of the logs to be attached
+        :param required_files: other files to be attached in full
+        :returns: dict of log paths to the maximum number of bytes to copy
+        """
+        if not self.bundle_budget:
+            return {source.path: self.max_log_bytes for source in sources}
+        level = self.compression_level \
+            if self.bundle_format in ARCHIVE_FORMATS else None
+        return allocate_budget(sources, required_files, self.bundle_budget,
+                               level)
+
+    def _get_attachments(self, info: dict, workspace: str = None,
+                         scopes: tuple = BUNDLE_SCOPES,
+                         delta: bool = False) -> list:
+        """
+        Parse dict information into attachment files for a support email.
+        If `delta` is requested, `info["bundle"]` is set to a record of the
+        included data to commit to `delta_state` once delivered.
         :param info: diagnostic information to parse into attachments
-        :returns: list of output attachment files
+        :param workspace: directory to write attachment files to (default new
+            temporary directory); a new directory is removed on failure
+        :param scopes: `BUNDLE_SCOPES` to include attachments for
+        :param delta: if True, only include data that is new since the last
+            delivered support email
+        :returns: list of output attachment files and FileSegments of
+            rotated logs
         """
-        log_files = self._get_log_files()
-        tempdir = mkdtemp()
-        att_files = list()
-        # Make a temp copy of log files to optionally truncate before sending
-        for log_file in log_files:
-            output_file = join(tempdir, basename(log_file))
-            shutil.copyfile(log_file, output_file)
-            att_files.append(output_file)
+        tempdir = workspace or create_workspace()
+        try:
+            return self._write_attachments(info, tempdir, scopes, delta)
+        except Exception:
+            if not workspace:
+                shutil.rmtree(tempdir, ignore_errors=True)
+            raise
 
+    def _write_attachments(self, info: dict, tempdir: str,
+                           scopes: tuple = BUNDLE_SCOPES,
+                           delta: bool = False) -> list:
+        """
+        Write attachment files for a support email. Files that are not
+        specific to this request are shared with other requests made within
+        `collection_ttl` and linked into `tempdir`.
+        :param info: diagnostic information to parse into attachments
+        :param tempdir: directory to write attachment files to
+        :param scopes: `BUNDLE_SCOPES` to include attachments for
+        :param delta: if True, only include data that is new since the last
+            delivered support email
+        :returns: list of output attachment files and FileSegments of
+            rotated logs
+        """
+        log_window = self._get_log_window(info.get("message_context"))
+        # A recent window moves with each request, so key on its length
+        window_key = log_window if self.log_window_mode == "utterance" \
+            else self.log_window_minutes
+        key = ("attachments", tuple(sorted(scopes)), window_key,
+               self.include_rotated_logs, self.compact_logs,
+               self.bundle_budget, self.bundle_format, self.compression_level,
+               self.max_log_bytes, self.diagnostics_format, self.redact,
+               tuple(sorted(self.redact_patterns.items())),
+               delta and self.delta_state.revision)
+        with self._collection_cache.use(key, lambda: self._write_shared_files(
+                info, log_window, scopes, delta)) as shared:
+            att_files = [self._link_file(file, tempdir)
+                         for file in shared["files"]]
+        if shared["log_compaction"]:
+            info["log_compaction"] = shared["log_compaction"]
+        if delta:
+            info["bundle"] = shared["bundle"]
+        # Packages are attached separately
+        info.pop('packages', None)
+
+        # Dump gathered diagnostics to separate file
+        diagnostics_file = join(tempdir, "diagnostics.txt")
+        self._write_diagnostics_file(info, diagnostics_file, self.redactor)
+        att_files.append(diagnostics_file)
+
+        return att_files
+
+    @staticmethod
+    def _link_file(file, directory: str):
+        """
+        Link a shared attachment file into a directory, so it outlives the
+        shared copy without copying its contents
+        :param file: path or FileSegment to link
+        :param directory: directory to link the file into
+        :returns: path of the linked file, or FileSegments unchanged
+        """
+        if isinstance(file, FileSegment):
+            return file
+        output_file = join(directory, basename(file))
+        try:
+            os.link(file, output_file)
+        except OSError:
+            shutil.copy2(file, output_file)
+        return output_file
+
+    @staticmethod
+    def _remove_shared_files(shared: dict):
+        """
+        Remove expired shared attachment files
+        :param shared: shared info or attachment files
+        """
+        if "workspace" in shared:
+            shutil.rmtree(shared["workspace"], ignore_errors=True)
+
+    def _write_shared_files(self, info: dict,
+                            log_window: Optional[Tuple[datetime, datetime]],
+                            scopes: tuple, delta: bool = False) -> dict:
+        """
+        Write attachment files that are not specific to one request to a new
+        workspace
+        :param info: diagnostic information
+        :param log_window: optional time window of logs to include
+        :param scopes: `BUNDLE_SCOPES` to include attachments for
+        :param delta: if True, only include data that is new since the last
+            delivered support email
+        :returns: dict `workspace` path and results of `_write_system_files`
+        """
+        tempdir = create_workspace()
+        try:
+            shared = self._write_system_files(info, tempdir, log_window,
+                                              scopes, delta)
+        except Exception:
+            shutil.rmtree(tempdir, ignore_errors=True)
+            raise
+        shared["workspace"] = tempdir
+        return shared
+
+    @staticmethod
+    def _get_log_source(log_file: str,
+                        log_window: Optional[Tuple[datetime, datetime]],
+                        offsets: Optional[dict]) -> FileSegment:
+        """
+        Get the part of a log that may be attached
+        :param log_file: path to the log file
+        :param log_window: optional time window of logs to include
+        :param offsets: dict of active logs to offsets already sent, None to
+            include all data in `log_window`
+        :returns: FileSegment of the log to attach
+        """
+        source = get_time_window_segment(log_file, *log_window) \
+            if log_window else FileSegment(log_file)
+        if offsets is not None and log_file.endswith('.log'):
+            source = FileSegment(log_file,
+                                 max(source.start, offsets[log_file]),
+                                 source.end)
+        return source
+
+    def _snapshot_log(self, source: FileSegment, tempdir: str, limit: int,
+                      redactor: Optional[Redactor],
+                      from_start: bool = False) -> Optional[dict]:
+        """
+        Snapshot the part of a log that will be attached. Active logs, which
+        may be written to or rotated before the bundle is built, are copied;
+        rotated logs are referenced in place unless they must be redacted.
+        :param source: FileSegment of the log to attach
+        :param tempdir: directory to write a copy of the log to
+        :param limit: maximum number of bytes of `source` to copy
+        :param redactor: optional Redactor to apply to the log
+        :param from_start: if True, copy the head of `source` so the rest can
+            be sent later, else copy its (most recent) tail
+        :returns: dict `file` path or FileSegment to attach, copied active log
+            byte `range` and `compaction` stats, None if there is nothing to
+            attach
+        """
+        log_file = source.path
+        segment = get_head_segment(source, limit) if from_start else \
+            get_tail_segment(source, limit)
+        if not log_file.endswith('.log'):
+            if not source.size:
+                return None
+            if not redactor:
+                # Rotated logs are not written to; reference them in place
+                # rather than copying (or decompressing) them
+                return {"file": source}
+            # Redacted copies are written decompressed
+            output_file = join(tempdir, basename(log_file)[:-3]
+                               if log_file.endswith('.gz')
+                               else basename(log_file))
+            redactor.redact_file(segment, output_file)
+            shutil.copystat(log_file, output_file)
+            return {"file": output_file}
+        if not segment.size:
+            # Nothing in the time window, or no budget for this log
+            return None
+        output_file = join(tempdir, basename(log_file))
+        snapshot = {"file": output_file,
+                    "range": [segment.start, segment.end]}
+        # Only copy the part of the log that may be attached
+        if self.compact_logs:
+            snapshot["compaction"] = compact_log(segment, output_file,
+                                                 redactor=redactor)
+        elif redactor:
+            redactor.redact_file(segment, output_file)
+        else:
+            segment.copy_to(output_file)
+        # Keep modification time so log recency can be prioritized
+        shutil.copystat(log_file, output_file)
+        return snapshot
+
+    def _write_system_files(self, info: dict, tempdir: str,
+                            log_window: Optional[Tuple[datetime, datetime]],
+                            scopes: tuple, delta: bool = False) -> dict:
+        """
+        Write logs, config and package attachments to a directory
+        :param info: diagnostic information
+        :param tempdir: directory to write attachment files to
+        :param log_window: optional time window of logs to include
+        :param scopes: `BUNDLE_SCOPES` to include attachments for
+        :param delta: if True, only include data that is new since the last
+            delivered support email
+        :returns: dict `files` list of files and FileSegments,
+            `log_compaction` stats and `bundle` record of included data
+        """
+        log_files = self._get_log_files(self.include_rotated_logs) \
+            if "logs" in scopes else []
+        offsets = self.delta_state.get_log_offsets(
+            [f for f in log_files if f.endswith('.log')]) if delta else None
+        bundle = {"mode": "delta" if offsets is not None else "full",
+                  "logs": {}, "log_ranges": {}, "files": {},
+                  "unchanged_files": {}}
+        if delta and offsets is None:
+            LOG.info("Sending a full bundle")
+        if offsets is not None:
+            # Rotated logs were sent in a previous bundle
+            log_files = [f for f in log_files if f.endswith('.log')]
+        redactor = self.redactor
+        other_files = list()
         for file in self.extra_diagnostic_files:
-            if isfile(file):
+            if "config" in scopes and isfile(file):
                 output_file = join(tempdir, basename(file))
-                shutil.copyfile(file, output_file)
-                att_files.append(output_file)
+                if redactor:
+                    redactor.redact_file(file, output_file)
+                else:
+                    shutil.copyfile(file, output_file)
+                other_files.append(output_file)
 
         packages_file = join(tempdir, "python_packages.txt")
-        diagnostics_file = join(tempdir, "diagnostics.txt")
         core_config_file = join(tempdir, "core_config.txt")
 
         # Add `pip list` output to its own file
-        with open(packages_file, 'w+') as f:
-            f.write(info.pop('packages', ""))
-        att_files.append(packages_file)
+        if "packages" in scopes:
+            with open(packages_file, 'w+') as f:
+                f.write(info.get('packages', ""))
+            other_files.append(packages_file)
 
         # Add core config output to its own file
-        with open(core_config_file, 'w+') as f:
-            yaml.dump(dict(self.config_core), f)
-        att_files.append(core_config_file)
+        if "config" in scopes:
+            self._write_diagnostics_file(dict(self.config_core),
+                                         core_config_file, redactor)
+            other_files.append(core_config_file)
 
-        # Dump gathered diagnostics to separate file
-        with open(diagnostics_file, 'w+') as f:
-            yaml.dump(info, f)
-        att_files.append(diagnostics_file)
+        att_files = list()
+        log_compaction = dict()
+        sources = [self._get_log_source(f, log_window, offsets)
+                   for f in log_files]
+        # Allocate the budget first so each log is only copied up to the
+        # part of it that can be attached
+        limits = self._get_snapshot_limits(sources, other_files)
+        # Logs are snapshotted concurrently; each snapshot streams through
+        # a fixed-size buffer, so memory is bounded by the number of workers
+        # In delta bundles, logs cut by the budget are sent oldest first so
+        # the rest is included in a later bundle
+        snapshots = map_ordered(
+            lambda s: self._snapshot_log(s, tempdir, limits[s.path],
+                                         redactor, offsets is not None),
+            sources, self.attachment_workers)
+        for log_file, snapshot in zip(log_files, snapshots):
+            sent_range = snapshot.get("range") if snapshot else None
+            if sent_range and sent_range[1] > sent_range[0]:
+                bundle["logs"][log_file] = get_log_checkpoint(
+                    log_file, sent_range[1])
+                bundle["log_ranges"][basename(log_file)] = sent_range
+            elif offsets and offsets.get(log_file):
+                # Nothing new was sent; keep the previous checkpoint
+                bundle["logs"][log_file] = get_log_checkpoint(
+                    log_file, offsets[log_file])
+            if not snapshot:
+                continue
+            if snapshot.get("compaction"):
+                log_compaction[basename(log_file)] = snapshot["compaction"]
+            att_files.append(snapshot["file"])
 
-        return att_files
+        for file in other_files:
+            name = basename(file)
+            file_hash = get_file_hash(file)
+            bundle["files"][name] = file_hash
+            if offsets is not None and \
+                    self.delta_state.get_sent_hash(name) == file_hash:
+                # Reference unchanged files by hash instead of attaching
+                bundle["unchanged_files"][name] = file_hash
+                continue
+            att_files.append(file)
+
+        return {"files": att_files, "log_compaction": log_compaction,
+                "bundle": bundle}
+
+    def _write_diagnostics_file(self, data: dict, output_file: str,
+                                redactor: Optional[Redactor] = None):
+        """
+        Write structured diagnostic data in `diagnostics_format`
+        :param data: dict to write
+        :param output_file: path to write to
+        :param redactor: optional Redactor to apply to `data`
+        """
+        if redactor:
+            data = redactor.redact_data(data)
+        with open(output_file, 'w') as f:
+            write_diagnostics(data, f, self.diagnostics_format)
+
+    def _update_diagnostics(self, files: list, info: dict):
+        """
+        Re-write the diagnostics attachment with updated information
+        :param files: list of attachment files from `_get_attachments`
+        :param info: updated diagnostic information
+        """
+        for file in files:
+            if isinstance(file, str) and basename(file) == "diagnostics.txt":
+                self._write_diagnostics_file(info, file, self.redactor)
 
     def stop(self):
         pass
+
+    def shutdown(self):
+        if self._outbox:
+            self._outbox.stop()
+        if self._resource_sampler:
+            self._resource_sampler.stop()
@@ -0,0 +1,402 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import re
+import shutil
+import zlib
+
+from base64 import b64encode
+from datetime import datetime
+from io import BytesIO
+from os import listdir
+from os.path import getmtime, getsize, isdir, join
+from tempfile import gettempdir, mkdtemp
+from time import time
+from typing import Dict, Iterator, List, Optional, Union
+from zipfile import ZipFile, ZIP_DEFLATED
+
+from .log_utils import FileSegment, as_segment, get_log_base, \
+    get_log_size, get_tail_segment, open_log
+
+# Raw bytes encoded at a time; a multiple of 3 so chunks need no padding
+B64_CHUNK_SIZE = 3 * 16384
+
+ARCHIVE_FORMATS = ("tar.gz", "zip")
+MANIFEST_NAME = "manifest.json"
+# Parts of a bundle that may be requested independently
+BUNDLE_SCOPES = ("status", "logs", "config", "packages")
+
+# Size increase of base64 encoding
+B64_OVERHEAD = 4 / 3
+# Reserved per archive member for headers and its manifest entry
+ARCHIVE_MEMBER_OVERHEAD = 1024
+# Margin applied to compression ratios estimated from a sample
+COMPRESSION_MARGIN = 1.2
+ERROR_LINE_PATTERN = re.compile(rb" - (?:ERROR|CRITICAL) - ")
+
+# Prefix of temporary directories support bundles are built in
+WORKSPACE_PREFIX = "neon_support_"
+# Seconds after which an unmodified workspace is considered abandoned
+STALE_WORKSPACE_AGE = 3600
+
+
+def create_workspace(base_dir: Optional[str] = None) -> str:
+    """
+    Create a temporary directory to build a support bundle in
+    :param base_dir: directory to create the workspace in (default system
+        temporary directory)
+    :returns: path to the new workspace
+    """
+    return mkdtemp(prefix=WORKSPACE_PREFIX, dir=base_dir)
+
+
+def clean_stale_workspaces(base_dir: Optional[str] = None,
+                           max_age: float = STALE_WORKSPACE_AGE,
+                           now: Optional[float] = None) -> List[str]:
+    """
+    Remove workspaces left behind by bundles that were never cleaned up, i.e.
+    if the skill crashed while building a bundle
+    :param base_dir: directory workspaces are created in (default system
+        temporary directory)
+    :param max_age: seconds since last modification after which a workspace
+        is removed
+    :param now: epoch time used to determine workspace age
+    :returns: list of removed workspace paths
+    """
+    base_dir = base_dir or gettempdir()
+    now = now or time()
+    removed = list()
+    for name in listdir(base_dir):
+        path = join(base_dir, name)
+        try:
+            if name.startswith(WORKSPACE_PREFIX) and isdir(path) and \
+                    now - getmtime(path) > max_age:
+                shutil.rmtree(path, ignore_errors=True)
+                removed.append(path)
+        except OSError:
+            # Removed concurrently
+            continue
+    return removed
+
+
+class Base64Attachment:
+    """
+    Streaming base64 representation of a file segment. Contents are encoded
+    in fixed-size chunks as they are consumed, so memory use is bounded by
+    the chunk size rather than the attachment size.
+    """
+    def __init__(self, segment: FileSegment, chunk_size: int = B64_CHUNK_SIZE):
+        """
+        :param segment: FileSegment to encode
+        :param chunk_size: number of raw bytes to encode at a time
+        """
+        if chunk_size <= 0 or chunk_size % 3:
+            raise ValueError(f"chunk_size must be a positive multiple of 3: "
+                             f"{chunk_size}")
+        self.segment = segment
+        self.chunk_size = chunk_size
+        self._reader: Optional[Iterator[str]] = None
+        self._buffer = ""
+
+    @property
+    def encoded_size(self) -> int:
+        """
+        Length of the complete base64 string
+        """
+        return 4 * -(-self.segment.size // 3)
+
+    def __iter__(self) -> Iterator[str]:
+        carry = b""
+        for chunk in self.segment.iter_chunks(self.chunk_size):
+            chunk = carry + chunk
+            cut = len(chunk) - len(chunk) % 3
+            carry = chunk[cut:]
+            if cut:
+                yield b64encode(chunk[:cut]).decode("utf-8")
+        if carry:
+            yield b64encode(carry).decode("utf-8")
+
+    def read(self, size: int = -1) -> str:
+        """
+        File-like read of the encoded contents
+        :param size: max number of characters to return; -1 to read all
+        :returns: encoded string, empty when all contents have been read
+        """
+        if self._reader is None:
+            self._reader = iter(self)
+        while size < 0 or len(self._buffer) < size:
+            try:
+                self._buffer += next(self._reader)
+            except StopIteration:
+                break
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def write_to(self, stream) -> int:
+        """
+        Write the encoded contents to a text stream
+        :param stream: writable text file-like object
+        :returns: number of characters written
+        """
+        written = 0
+        for chunk in self:
+            written += stream.write(chunk)
+        return written
+
+    def to_string(self) -> str:
+        """
+        Get the complete base64 string for APIs that require one
+        """
+        return "".join(self)
+
+
+def write_archive(segments: Dict[str, FileSegment], output_file: str,
+                  archive_format: str = "tar.gz",
+                  compression_level: int = 6,
+                  manifest_info: Optional[dict] = None) -> dict:
+    """
+    Stream file segments into a single compressed archive. A manifest listing
+    original sizes, included byte ranges and compressed sizes is added to the
+    archive as `manifest.json`.
+    :param segments: dict of archive member names to FileSegments to include
+    :param output_file: path to the archive file to write
+    :param archive_format: one of `ARCHIVE_FORMATS`
+    :param compression_level: compression level 0-9
+    :param manifest_info: optional additional data to include in the manifest
+    :returns: manifest dict written to the archive
+    """
+    if archive_format not in ARCHIVE_FORMATS:
+        raise ValueError(f"Unsupported archive format: {archive_format}")
+    manifest = {"format": archive_format,
+                "compression_level": compression_level,
+                "generated_time_utc": datetime.utcnow().isoformat(),
+                **(manifest_info or {}),
+                "files": []}
+    if archive_format == "zip":
+        _write_zip(segments, output_file, compression_level, manifest)
+    else:
+        _write_tar_gz(segments, output_file, compression_level, manifest)
+    manifest["archive_size"] = getsize(output_file)
+    return manifest
+
+
+def _get_manifest_entry(name: str, segment: FileSegment,
+                        compressed_size: int) -> dict:
+    return {"name": name,
+            "source": segment.path,
+            "original_size": get_log_size(segment.path),
+            "included_size": segment.size,
+            "truncated_at": segment.start or None,
+            "compressed_size": compressed_size}
+
+
+def _dump_manifest(manifest: dict) -> bytes:
+    for key in ("original_size", "included_size", "compressed_size"):
+        manifest[key] = sum(f[key] for f in manifest["files"])
+    return json.dumps(manifest, indent=2).encode("utf-8")
+
+
+def _write_tar_gz(segments: Dict[str, FileSegment], output_file: str,
+                  compression_level: int, manifest: dict):
+    # Imported here to keep skill load time down
+    import tarfile
+    from gzip import GzipFile
+
+    with open(output_file, 'wb') as raw:
+        with GzipFile(fileobj=raw, mode='wb',
+                      compresslevel=compression_level) as gz:
+            with tarfile.open(fileobj=gz, mode='w') as tar:
+                for name, segment in segments.items():
+                    position = raw.tell()
+                    member = tarfile.TarInfo(name)
+                    member.size = segment.size
+                    member.mtime = getmtime(segment.path)
+                    with open_log(segment.path) as f:
+                        f.seek(segment.start)
+                        tar.addfile(member, f)
+                    # Sync flush so each member's compressed size is exact
+                    gz.flush()
+                    manifest["files"].append(_get_manifest_entry(
+                        name, segment, raw.tell() - position))
+                manifest_bytes = _dump_manifest(manifest)
+                member = tarfile.TarInfo(MANIFEST_NAME)
+                member.size = len(manifest_bytes)
+                member.mtime = time()
+                tar.addfile(member, BytesIO(manifest_bytes))
+
+
+def _write_zip(segments: Dict[str, FileSegment], output_file: str,
+               compression_level: int, manifest: dict):
+    with ZipFile(output_file, 'w', compression=ZIP_DEFLATED,
+                 compresslevel=compression_level) as archive:
+        for name, segment in segments.items():
+            with archive.open(name, 'w',
+                              force_zip64=segment.size > 0x7fffffff) as f:
+                for chunk in segment.iter_chunks():
+                    f.write(chunk)
+            manifest["files"].append(_get_manifest_entry(
+                name, segment, archive.getinfo(name).compress_size))
+        archive.writestr(MANIFEST_NAME, _dump_manifest(manifest))
+
+
+def get_log_priority(path: str, sample: bytes,
+                     now: Optional[float] = None) -> float:
+    """
+    Get a relative priority for including a log file. Recently written logs
+    and logs with recent errors are weighted higher.
+    :param path: path to the log file
+    :param sample: bytes from the end of the log
+    :param now: epoch time to compute log age from (default current time)
+    :returns: priority weight between 1.0 and 5.0
+    """
+    age_hours = max((now or time()) - getmtime(path), 0) / 3600
+    priority = 1 + 2 / (1 + age_hours)
+    if ERROR_LINE_PATTERN.search(sample):
+        priority += 2
+    return priority
+
+
+def estimate_compression_ratio(sample: bytes,
+                               compression_level: Optional[int]) -> float:
+    """
+    Estimate the compressed size of a file relative to its original size
+    :param sample: bytes representative of the file
+    :param compression_level: compression level 0-9, None for uncompressed
+    :returns: conservative ratio of compressed to original size
+    """
+    if compression_level is None or not sample:
+        return 1.0
+    compressed = len(zlib.compress(sample, compression_level))
+    return min(compressed * COMPRESSION_MARGIN / len(sample), 1.0)
+
+
+def get_max_included_size(source: Union[str, FileSegment], budget: int,
+                          compression_level: Optional[int] = None,
+                          sample_size: int = 65536) -> int:
+    """
+    Get the most bytes of a log `allocate_budget` could include from it,
+    which is the size of its tail that would fit the entire budget
+    :param source: path to the log file or FileSegment
+    :param budget: maximum total size in bytes of encoded attachments
+    :param compression_level: archive compression level, None if the files
+        are attached without compression
+    :param sample_size: number of bytes from the end of the file to sample
+    :returns: maximum number of bytes to include
+    """
+    source = as_segment(source)
+    sample = get_tail_segment(source, sample_size).read()
+    cost = estimate_compression_ratio(sample, compression_level) * \
+        B64_OVERHEAD
+    return min(source.size, int(budget / cost))
+
+
+def allocate_budget(log_files: List[Union[str, FileSegment]],
+                    required_files: List[Union[str, FileSegment]],
+                    budget: int, compression_level: Optional[int] = None,
+                    sample_size: int = 65536,
+                    now: Optional[float] = None) -> Dict[str, int]:
+    """
+    Split a bundle-wide size budget across files. Required files are always
+    included in full; the remaining budget is shared between logs in
+    proportion to `get_log_priority`, with any share a log doesn't need
+    redistributed to the others. Rotated segments of a log share its
+    allocation and are only included (newest first) once the newer segments
+    are included in full. Base64 and (estimated) compression overhead are
+    accounted for so that encoded attachments fit within `budget`.
+    :param log_files: list of log files or segments to include tails of
+    :param required_files: list of files or segments to include in full
+    :param budget: maximum total size in bytes of encoded attachments
+    :param compression_level: archive compression level, None if the files
+        are attached without compression
+    :param sample_size: number of bytes from the end of each file to sample
+    :param now: epoch time used to determine log recency
+    :returns: dict of file paths to the number of bytes to include
+    """
+    member_overhead = B64_OVERHEAD * (ARCHIVE_MEMBER_OVERHEAD
+                                      if compression_level is not None else 0)
+    remaining = budget
+    limits = dict()
+    for file in map(as_segment, required_files):
+        sample = get_tail_segment(file, sample_size).read()
+        ratio = estimate_compression_ratio(sample, compression_level)
+        remaining -= file.size * ratio * B64_OVERHEAD + member_overhead
+        limits[file.path] = file.size
+
+    # Group rotated segments with their active log, newest first
+    groups = dict()
+    for file in map(as_segment, log_files):
+        groups.setdefault(get_log_base(file.path), list()).append(file)
+    costs = dict()
+    full_costs = dict()
+    weights = dict()
+    for name, members in groups.items():
+        members.sort(key=lambda f: getmtime(f.path), reverse=True)
+        # Sample the newest uncompressed segment to avoid decompressing
+        newest = next((f for f in members if not f.path.endswith('.gz')),
+                      members[0])
+        sample = get_tail_segment(newest, sample_size).read()
+        costs[name] = estimate_compression_ratio(
+            sample, compression_level) * B64_OVERHEAD
+        # Additional archive members need their own headers
+        full_costs[name] = sum(f.size for f in members) * costs[name] + \
+            (len(members) - 1) * member_overhead
+        weights[name] = get_log_priority(newest.path, sample, now)
+        remaining -= member_overhead
+
+    allocations = dict()
+    pending = set(groups)
+    while pending and remaining > 0:
+        total_weight = sum(weights[g] for g in pending)
+        shares = {g: remaining * weights[g] / total_weight for g in pending}
+        complete = [g for g in pending if full_costs[g] <= shares[g]]
+        if not complete:
+            for name in pending:
+                allocations[name] = shares[name]
+            break
+        for name in complete:
+            # Included in full without rounding the allocation
+            allocations[name] = None
+            remaining -= full_costs[name]
+            pending.remove(name)
+
+    for name, members in groups.items():
+        allocation = allocations.get(name, 0)
+        if allocation is None:
+            limits.update((file.path, file.size) for file in members)
+            continue
+        for index, file in enumerate(members):
+            if index:
+                # Additional archive members need their own headers
+                allocation -= member_overhead
+            limit = max(min(file.size, int(allocation / costs[name])), 0)
+            limits[file.path] = limit
+            allocation -= limit * costs[name]
+    return limits
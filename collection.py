@@ -0,0 +1,198 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from contextlib import contextmanager
+from threading import Event, Lock, Thread, Timer
+from typing import Any, Callable, Hashable, Iterator, Optional
+
+from ovos_utils.log import LOG
+
+
+class BackgroundJob:
+    """
+    Run a function in a background thread so it can overlap with other work
+    (i.e. waiting on user responses). The function must accept a `cancelled`
+    keyword argument; it is passed an Event that is set if the job is
+    cancelled, which should be checked between expensive steps.
+    """
+    def __init__(self, target: Callable, *args,
+                 cancelled: Optional[Event] = None, **kwargs):
+        """
+        :param target: function to run
+        :param cancelled: Event to cancel the job with, i.e. shared with the
+            job that started it (default new Event)
+        """
+        self.cancelled = cancelled or Event()
+        self._complete = Event()
+        self._result = None
+        self._exception: Optional[Exception] = None
+        self._thread = Thread(target=self._run, args=(target, args, kwargs),
+                              daemon=True)
+        self._thread.start()
+
+    def _run(self, target: Callable, args: tuple, kwargs: dict):
+        try:
+            self._result = target(*args, cancelled=self.cancelled, **kwargs)
+        except Exception as e:
+            self._exception = e
+        finally:
+            self._complete.set()
+
+    @property
+    def done(self) -> bool:
+        return self._complete.is_set()
+
+    def cancel(self):
+        """
+        Request that the job stop at its next checkpoint
+        """
+        self.cancelled.set()
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        """
+        Wait for the job to complete and get its result
+        :param timeout: max seconds to wait for the job to complete
+        :returns: value returned by the job target
+        """
+        if not self._complete.wait(timeout):
+            raise TimeoutError("Background job did not complete in time")
+        if self._exception:
+            raise self._exception
+        return self._result
+
+
+class _CacheEntry:
+    def __init__(self):
+        self.ready = Event()
+        self.result = None
+        self.exception: Optional[Exception] = None
+        self.users = 0
+        self.evicted = False
+
+
+class CoalescingCache:
+    """
+    Single-flight cache of expensive results. Concurrent requests for the
+    same key share one computation and completed results are reused for
+    `ttl` seconds. An optional `cleanup` function is called with each expired
+    result once no caller is using it, i.e. to remove files it references.
+    """
+    def __init__(self, ttl: float,
+                 cleanup: Optional[Callable[[Any], None]] = None):
+        """
+        :param ttl: seconds to reuse a completed result for
+        :param cleanup: function to call with expired results
+        """
+        self.ttl = ttl
+        self._cleanup = cleanup
+        self._lock = Lock()
+        self._entries = dict()
+
+    @contextmanager
+    def use(self, key: Hashable, func: Callable[[], Any]) -> Iterator[Any]:
+        """
+        Get the result of `func` for `key`, computing it only if there is no
+        unexpired or in-progress result. The result will not be cleaned up
+        before the context exits.
+        :param key: key identifying the result
+        :param func: function to compute the result
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            owner = entry is None
+            if owner:
+                entry = _CacheEntry()
+                self._entries[key] = entry
+            entry.users += 1
+        try:
+            if owner:
+                self._compute(key, entry, func)
+            else:
+                entry.ready.wait()
+            if entry.exception:
+                raise entry.exception
+            yield entry.result
+        finally:
+            with self._lock:
+                entry.users -= 1
+                expired = entry.evicted and not entry.users
+            if expired:
+                self._clean(entry)
+
+    def get(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """
+        Get the result of `func` for `key` for a result that does not need
+        cleanup
+        :param key: key identifying the result
+        :param func: function to compute the result
+        """
+        with self.use(key, func) as result:
+            return result
+
+    def clear(self):
+        """
+        Expire all completed results
+        """
+        with self._lock:
+            entries = [(k, e) for k, e in self._entries.items()
+                       if e.ready.is_set()]
+        for key, entry in entries:
+            self._expire(key, entry)
+
+    def _compute(self, key: Hashable, entry: _CacheEntry,
+                 func: Callable[[], Any]):
+        try:
+            entry.result = func()
+        except Exception as e:
+            entry.exception = e
+        finally:
+            entry.ready.set()
+        if entry.exception:
+            # Don't cache failures
+            self._expire(key, entry)
+            return
+        timer = Timer(self.ttl, self._expire, (key, entry))
+        timer.daemon = True
+        timer.start()
+
+    def _expire(self, key: Hashable, entry: _CacheEntry):
+        with self._lock:
+            if self._entries.get(key) is not entry:
+                return
+            del self._entries[key]
+            entry.evicted = True
+            expired = not entry.users
+        if expired:
+            self._clean(entry)
+
+    def _clean(self, entry: _CacheEntry):
+        if self._cleanup and not entry.exception:
+            try:
+                self._cleanup(entry.result)
+            except Exception as e:
+                LOG.error(f"Failed to clean up cached result: {e}")
@@ -0,0 +1,155 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+
+from hashlib import sha256
+from os import replace, stat
+from os.path import isfile
+from threading import Lock
+from typing import Dict, List, Optional
+
+from ovos_utils.log import LOG
+
+from .log_utils import FileSegment
+
+# Bytes preceding a log offset hashed to detect a log rewritten in place
+CHECKPOINT_BYTES = 4096
+BUNDLE_MODES = ("full", "delta")
+
+
+def get_file_hash(path: str) -> str:
+    """
+    Get the SHA-256 hex digest of a file's contents
+    """
+    digest = sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_log_checkpoint(path: str, offset: int) -> dict:
+    """
+    Get a checkpoint identifying the contents of an active log up to `offset`
+    :param path: path to the active log file
+    :param offset: byte offset the log has been sent up to
+    :returns: dict `inode`, `offset` and `hash` of the bytes preceding offset
+    """
+    segment = FileSegment(path, max(offset - CHECKPOINT_BYTES, 0), offset)
+    return {"inode": stat(path).st_ino, "offset": offset,
+            "hash": sha256(segment.read()).hexdigest()}
+
+
+class DeltaState:
+    """
+    Persistent record of the files included in the last delivered support
+    bundle, used to only include data that is new since then. Active logs
+    are checkpointed by inode and offset with a hash of the preceding bytes,
+    so a rotated or rewritten log is detected; other files are recorded by
+    content hash.
+    """
+    def __init__(self, state_file: str):
+        """
+        :param state_file: path to the JSON file to persist state to
+        """
+        self.state_file = state_file
+        self._lock = Lock()
+        self._data = self._load()
+
+    def _load(self) -> dict:
+        if isfile(self.state_file):
+            try:
+                with open(self.state_file) as f:
+                    return json.load(f)
+            except Exception as e:
+                LOG.error(f"Failed to load bundle state: {e}")
+        return {"revision": 0, "logs": {}, "files": {}}
+
+    @property
+    def revision(self) -> int:
+        """
+        Counter incremented each time the state is updated
+        """
+        return self._data["revision"]
+
+    def get_log_offsets(self, log_files: List[str]) -> Optional[Dict[str,
+                                                                    int]]:
+        """
+        Get the offsets active logs were previously sent up to. Logs created
+        since the previous bundle start at offset 0.
+        :param log_files: list of active log files
+        :returns: dict of log files to offsets, None if no bundle was sent
+            previously or any log has been rotated since
+        """
+        offsets = dict()
+        with self._lock:
+            logs = dict(self._data["logs"])
+        if not logs:
+            LOG.info("No previous bundle")
+            return None
+        for log_file in log_files:
+            previous = logs.get(log_file)
+            if not previous:
+                offsets[log_file] = 0
+                continue
+            try:
+                if stat(log_file).st_size < previous["offset"] or \
+                        get_log_checkpoint(log_file, previous["offset"]) != \
+                        previous:
+                    LOG.info(f"{log_file} rotated since previously sent")
+                    return None
+            except OSError as e:
+                LOG.warning(f"Failed to check {log_file}: {e}")
+                return None
+            offsets[log_file] = previous["offset"]
+        return offsets
+
+    def get_sent_hash(self, name: str) -> Optional[str]:
+        """
+        Get the hash of a file when it was last sent
+        :param name: attachment name of the file
+        :returns: hash of the file contents, None if never sent
+        """
+        with self._lock:
+            return self._data["files"].get(name)
+
+    def commit(self, sent: dict):
+        """
+        Record the contents of a delivered bundle and write state to disk
+        :param sent: dict `logs` of log files to checkpoints and `files` of
+            attachment names to hashes
+        """
+        with self._lock:
+            self._data["logs"] = sent.get("logs") or {}
+            self._data["files"].update(sent.get("files") or {})
+            self._data["revision"] += 1
+            tmp_file = f"{self.state_file}.tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump(self._data, f)
+            replace(tmp_file, self.state_file)
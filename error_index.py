@@ -0,0 +1,244 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import re
+
+from datetime import datetime
+from os import stat, replace
+from os.path import isfile
+from threading import Lock
+from time import time
+from typing import Dict, List, Optional
+
+from ovos_utils.log import LOG
+
+from .log_utils import LOG_TIMESTAMP_PATTERN, MAX_LINE_LENGTH, \
+    find_rotated_logs, parse_log_timestamp
+
+# Logger name and level following the timestamp of a log entry
+ENTRY_PATTERN = re.compile(rb" - (?P<name>.+?) - (?P<level>[A-Z]+) - ")
+ERROR_LEVELS = (b"ERROR", b"CRITICAL")
+TRACEBACK_LINE = b"Traceback (most recent call last):"
+
+
+def get_boot_time() -> Optional[float]:
+    """
+    Get the system boot time from /proc/stat
+    :returns: epoch time of the last boot, None if not available
+    """
+    try:
+        with open("/proc/stat") as f:
+            for line in f:
+                if line.startswith("btime"):
+                    return float(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _add_occurrence(record: dict, timestamp: float):
+    record["count"] = record.get("count", 0) + 1
+    record["first"] = min(record.get("first") or timestamp, timestamp)
+    record["last"] = max(record.get("last") or timestamp, timestamp)
+
+
+class ErrorIndex:
+    """
+    Persistent, incrementally updated index of ERROR/CRITICAL log entries and
+    exception tracebacks. A byte offset is checkpointed per log file (keyed by
+    inode to detect rotation), so each update only reads data written since
+    the previous update. Occurrences are aggregated per logger into hourly
+    buckets for time-based summaries and since-boot totals.
+    """
+    def __init__(self, index_file: str, retention_hours: int = 168):
+        """
+        :param index_file: path to the JSON file to persist the index to
+        :param retention_hours: number of hours of history to keep
+        """
+        self.index_file = index_file
+        self.retention_hours = retention_hours
+        self._lock = Lock()
+        self._data = self._load()
+
+    def _load(self) -> dict:
+        data = None
+        if isfile(self.index_file):
+            try:
+                with open(self.index_file) as f:
+                    data = json.load(f)
+            except Exception as e:
+                LOG.error(f"Failed to load error index: {e}")
+        data = data or {"files": {}, "since_boot": {}, "hourly": {}}
+        boot_time = get_boot_time()
+        if data.get("boot_time") != boot_time:
+            data["boot_time"] = boot_time
+            data["since_boot"] = {}
+        return data
+
+    def save(self):
+        """
+        Write the index to disk
+        """
+        with self._lock:
+            tmp_file = f"{self.index_file}.tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump(self._data, f)
+            replace(tmp_file, self.index_file)
+
+    def update(self, log_files: List[str]) -> int:
+        """
+        Index data written to log files since the last update
+        :param log_files: list of active log files to index
+        :returns: number of bytes read
+        """
+        read_bytes = 0
+        with self._lock:
+            for log_file in log_files:
+                try:
+                    read_bytes += self._update_file(log_file)
+                except Exception as e:
+                    LOG.error(f"Failed to index {log_file}: {e}")
+            self._prune()
+        return read_bytes
+
+    def _update_file(self, log_file: str) -> int:
+        info = stat(log_file)
+        state = self._data["files"].get(log_file)
+        read_bytes = 0
+        if state and state["inode"] != info.st_ino:
+            # Log was rotated; finish indexing the old file if it still exists
+            for rotated in find_rotated_logs(log_file):
+                if not rotated.endswith('.gz') and \
+                        stat(rotated).st_ino == state["inode"]:
+                    read_bytes += self._scan(rotated, state)
+                    break
+            state = None
+        if not state or info.st_size < state["offset"]:
+            state = {"offset": 0, "logger": None}
+        state["inode"] = info.st_ino
+        read_bytes += self._scan(log_file, state)
+        self._data["files"][log_file] = state
+        return read_bytes
+
+    def _scan(self, path: str, state: dict) -> int:
+        """
+        Index complete lines of a file starting at the checkpointed offset and
+        advance the checkpoint
+        """
+        start = state["offset"]
+        with open(path, 'rb') as f:
+            f.seek(start)
+            position = start
+            while True:
+                line = f.readline(MAX_LINE_LENGTH)
+                length = len(line)
+                # Skip the rest of long lines; only their start is indexed
+                chunk = line
+                while len(chunk) == MAX_LINE_LENGTH and \
+                        not chunk.endswith(b'\n'):
+                    chunk = f.readline(MAX_LINE_LENGTH)
+                    length += len(chunk)
+                if not chunk.endswith(b'\n'):
+                    # Partial line at EOF is indexed on the next update
+                    break
+                position += length
+                self._index_line(line, state)
+        state["offset"] = position
+        return position - start
+
+    def _index_line(self, line: bytes, state: dict):
+        match = LOG_TIMESTAMP_PATTERN.match(line)
+        if match:
+            entry = ENTRY_PATTERN.match(line, match.end())
+            state["logger"] = entry.group("name").decode(errors="replace") \
+                if entry else None
+            timestamp = parse_log_timestamp(line)
+            state["time"] = timestamp.timestamp() if timestamp else time()
+            state["counted"] = bool(entry and
+                                    entry.group("level") in ERROR_LEVELS)
+            if state["counted"]:
+                self._add(state["logger"], state["time"])
+        elif line.startswith(TRACEBACK_LINE) and not state.get("counted"):
+            # Exception not logged as an error; count once per entry
+            state["counted"] = True
+            self._add(state.get("logger") or "unknown",
+                      state.get("time") or time())
+
+    def _add(self, logger: str, timestamp: float):
+        boot_time = self._data["boot_time"]
+        if boot_time is None or timestamp >= boot_time:
+            _add_occurrence(self._data["since_boot"].setdefault(logger, {}),
+                            timestamp)
+        hour = str(int(timestamp // 3600 * 3600))
+        _add_occurrence(self._data["hourly"].setdefault(logger, {})
+                        .setdefault(hour, {}), timestamp)
+
+    def _prune(self):
+        oldest = time() - self.retention_hours * 3600
+        for logger in list(self._data["hourly"]):
+            buckets = self._data["hourly"][logger]
+            for hour in [h for h in buckets if int(h) + 3600 < oldest]:
+                buckets.pop(hour)
+            if not buckets:
+                self._data["hourly"].pop(logger)
+
+    def get_summary(self, hours: int = 24,
+                    now: Optional[float] = None) -> Dict[str, dict]:
+        """
+        Summarize indexed errors per logger
+        :param hours: number of recent hours to summarize (hour granularity)
+        :param now: epoch time to summarize from (default current time)
+        :returns: dict with `since_boot` and `last_<hours>h` summaries of
+            logger names to occurrence count and first/last times
+        """
+        since = (now or time()) - hours * 3600
+        recent = dict()
+        with self._lock:
+            for logger, buckets in self._data["hourly"].items():
+                for bucket in buckets.values():
+                    if bucket["last"] >= since:
+                        record = recent.setdefault(logger, {"count": 0})
+                        record["count"] += bucket["count"]
+                        record["first"] = min(record.get("first") or
+                                              bucket["first"], bucket["first"])
+                        record["last"] = max(record.get("last") or
+                                             bucket["last"], bucket["last"])
+            since_boot = {logger: dict(record) for logger, record in
+                          self._data["since_boot"].items()}
+        return {"since_boot": self._format(since_boot),
+                f"last_{hours}h": self._format(recent)}
+
+    @staticmethod
+    def _format(summary: Dict[str, dict]) -> Dict[str, dict]:
+        return {logger: {"count": record["count"],
+                         "first": datetime.fromtimestamp(
+                             record["first"]).isoformat(),
+                         "last": datetime.fromtimestamp(
+                             record["last"]).isoformat()}
+                for logger, record in sorted(summary.items())}
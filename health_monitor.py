@@ -0,0 +1,169 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from array import array
+from datetime import datetime
+from threading import Lock
+from time import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Service states reported by `probe_services`, stored as single-byte codes
+SERVICE_STATES = ("not_ready", "ready", "timeout")
+# Number of state transitions retained per service
+HISTORY_SIZE = 256
+
+
+class TransitionBuffer:
+    """
+    Fixed-size ring buffer of (timestamp, state code) transitions. Storage
+    is allocated up front, so memory use does not grow with uptime; once
+    full, the oldest transition is overwritten.
+    """
+    def __init__(self, capacity: int = HISTORY_SIZE):
+        self.capacity = max(int(capacity), 1)
+        self._times = array('d', [0.0]) * self.capacity
+        self._states = array('b', [0]) * self.capacity
+        self._start = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Tuple[float, int]]:
+        for i in range(self._count):
+            idx = (self._start + i) % self.capacity
+            yield self._times[idx], self._states[idx]
+
+    @property
+    def last(self) -> Optional[Tuple[float, int]]:
+        """
+        Most recent (timestamp, state code), None if the buffer is empty
+        """
+        if not self._count:
+            return None
+        idx = (self._start + self._count - 1) % self.capacity
+        return self._times[idx], self._states[idx]
+
+    def append(self, timestamp: float, state: int):
+        """
+        Add a transition, overwriting the oldest one if the buffer is full
+        :param timestamp: epoch time of the transition
+        :param state: state code entered at `timestamp`
+        """
+        idx = (self._start + self._count) % self.capacity
+        self._times[idx] = timestamp
+        self._states[idx] = state
+        if self._count < self.capacity:
+            self._count += 1
+        else:
+            self._start = (self._start + 1) % self.capacity
+
+
+class HealthMonitor:
+    """
+    Record of service readiness over time. Only changes of state are stored,
+    so a service that stays ready uses one entry regardless of how often it
+    is checked.
+    """
+    def __init__(self, capacity: int = HISTORY_SIZE):
+        self.capacity = capacity
+        self._lock = Lock()
+        self._history: Dict[str, TransitionBuffer] = dict()
+
+    def record(self, service: str, state: str,
+               timestamp: Optional[float] = None):
+        """
+        Record an observed service state
+        :param service: name of the service
+        :param state: one of `SERVICE_STATES`
+        :param timestamp: epoch time of the observation, defaults to now
+        """
+        if state not in SERVICE_STATES:
+            raise ValueError(f"Invalid service state: {state}")
+        code = SERVICE_STATES.index(state)
+        timestamp = time() if timestamp is None else timestamp
+        with self._lock:
+            history = self._history.setdefault(
+                service, TransitionBuffer(self.capacity))
+            last = history.last
+            if last is None or last[1] != code:
+                history.append(timestamp, code)
+
+    def record_probe(self, probe: Dict[str, dict],
+                     timestamp: Optional[float] = None):
+        """
+        Record the result of `probe_services`
+        :param probe: dict of service name to result with a `state`
+        :param timestamp: epoch time of the probe, defaults to now
+        """
+        timestamp = time() if timestamp is None else timestamp
+        for service, result in probe.items():
+            self.record(service, result["state"], timestamp)
+
+    @staticmethod
+    def _get_service_report(transitions: List[Tuple[float, int]],
+                            window_start: float, now: float) -> dict:
+        timeline = list()
+        ready = observed = 0.0
+        for i, (timestamp, code) in enumerate(transitions):
+            end = transitions[i + 1][0] if i + 1 < len(transitions) else now
+            # Include the transition that set the state at the window start
+            if end > window_start:
+                timeline.append({
+                    "time": datetime.fromtimestamp(timestamp).isoformat(),
+                    "state": SERVICE_STATES[code]})
+            duration = max(min(end, now) - max(timestamp, window_start), 0)
+            observed += duration
+            if SERVICE_STATES[code] == "ready":
+                ready += duration
+        return {"state": SERVICE_STATES[transitions[-1][1]],
+                "uptime_percent": round(100 * ready / observed, 2)
+                if observed else None,
+                "observed_seconds": round(observed),
+                "timeline": timeline}
+
+    def get_report(self, hours: float = 24,
+                   now: Optional[float] = None) -> Dict[str, dict]:
+        """
+        Summarize service health over a recent period. A state is assumed to
+        last until the next recorded transition; time before the first
+        retained transition is not counted towards uptime.
+        :param hours: number of hours of history to report
+        :param now: epoch time to report at, defaults to now
+        :returns: dict of service name to current `state`, `uptime_percent`
+            (None if the service has not been observed in the period),
+            `observed_seconds` and a `timeline` of state changes
+        """
+        now = time() if now is None else now
+        window_start = now - hours * 3600
+        with self._lock:
+            history = {service: list(transitions) for service, transitions
+                       in self._history.items()}
+        return {service: self._get_service_report(transitions, window_start,
+                                                  now)
+                for service, transitions in history.items() if transitions}
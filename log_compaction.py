@@ -0,0 +1,213 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import re
+
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import BinaryIO, Optional, Union
+
+from .log_utils import LOG_TIMESTAMP_PATTERN, MAX_LINE_LENGTH, FileSegment, \
+    as_segment, open_log
+from .redaction import Redactor, RedactingWriter
+
+# Numeric values (including hex addresses) masked when fingerprinting lines
+NUMBER_PATTERN = re.compile(rb"0x[0-9a-fA-F]+|\d+")
+# Entries larger than this are passed through without compaction
+MAX_ENTRY_BYTES = 1048576
+
+
+def get_fingerprint(line: bytes) -> bytes:
+    """
+    Get a fingerprint of a log line with its timestamp and numbers masked,
+    so that repeats of the same message compare equal
+    :param line: raw log line
+    :returns: masked line
+    """
+    line = LOG_TIMESTAMP_PATTERN.sub(b"", line, count=1)
+    return NUMBER_PATTERN.sub(b"#", line)
+
+
+class LogCompactor:
+    """
+    Streaming log compaction. Consecutive repeats of an entry (ignoring
+    timestamps and numbers) are collapsed into the first instance and a count,
+    and multi-line entries (i.e. tracebacks) seen earlier in the log are
+    replaced by a reference, with a summary of repeats written at the end.
+    Memory use is bounded by `MAX_ENTRY_BYTES` and `max_tracked`.
+    """
+    def __init__(self, output: BinaryIO, max_tracked: int = 1024):
+        """
+        :param output: binary stream to write compacted log to
+        :param max_tracked: max number of distinct multi-line entries to track
+        """
+        self._output = output
+        self._max_tracked = max_tracked
+        self._tracked = OrderedDict()
+        self._tracked_count = 0
+        self._entry = list()
+        self._entry_size = 0
+        self._entry_time: Optional[bytes] = None
+        self._passthrough = False
+        self._last_fingerprint: Optional[bytes] = None
+        self._run_count = 0
+        self._run_last_time: Optional[bytes] = None
+        self.input_size = 0
+        self.output_size = 0
+        self.entries = 0
+        self.collapsed_entries = 0
+
+    def _write(self, data: bytes):
+        self.output_size += self._output.write(data)
+
+    def feed(self, line: bytes):
+        """
+        Process the next line of the log
+        :param line: raw log line, including its line ending
+        """
+        self.input_size += len(line)
+        timestamp = LOG_TIMESTAMP_PATTERN.match(line)
+        if timestamp:
+            self._end_entry()
+            self._entry_time = timestamp.group(0)
+        elif self._passthrough:
+            self._write(line)
+            return
+        self._entry.append(line)
+        self._entry_size += len(line)
+        if self._entry_size > MAX_ENTRY_BYTES:
+            # Too large to fingerprint in memory; write it out unmodified
+            self._end_run()
+            self._last_fingerprint = None
+            self._write(b"".join(self._entry))
+            self._entry = list()
+            self._entry_size = 0
+            self._passthrough = True
+
+    def _end_run(self):
+        if self._run_count:
+            self._write(f"[compacted] previous entry repeated "
+                        f"{self._run_count} more times, last at "
+                        f"{self._run_last_time.decode()}\n".encode())
+            self._run_count = 0
+
+    def _end_entry(self):
+        entry, self._entry = self._entry, list()
+        self._entry_size = 0
+        self._passthrough = False
+        if not entry:
+            return
+        self.entries += 1
+        digest = blake2b(digest_size=16)
+        for line in entry:
+            digest.update(get_fingerprint(line))
+        fingerprint = digest.digest()
+        tracked = self._tracked.get(fingerprint)
+        if tracked:
+            tracked["count"] += 1
+            tracked["last"] = self._entry_time
+            self._tracked.move_to_end(fingerprint)
+
+        if fingerprint == self._last_fingerprint:
+            self._run_count += 1
+            self._run_last_time = self._entry_time
+            self.collapsed_entries += 1
+            return
+        self._end_run()
+        self._last_fingerprint = fingerprint
+
+        if len(entry) > 1:
+            if tracked:
+                self._write(entry[0])
+                self._write(f"[compacted] repeat of multi-line entry "
+                            f"#{tracked['id']} omitted\n".encode())
+                self.collapsed_entries += 1
+                return
+            self._tracked_count += 1
+            self._tracked[fingerprint] = {"id": self._tracked_count,
+                                          "count": 1,
+                                          "first": self._entry_time,
+                                          "last": self._entry_time}
+            if len(self._tracked) > self._max_tracked:
+                self._tracked.popitem(last=False)
+        for line in entry:
+            self._write(line)
+
+    def close(self) -> dict:
+        """
+        Finish processing the log and write a summary of repeated entries
+        :returns: dict compaction statistics
+        """
+        self._end_entry()
+        self._end_run()
+        repeated = [t for t in self._tracked.values() if t["count"] > 1]
+        if repeated:
+            self._write(b"[compacted] repeated multi-line entries:\n")
+            for entry in sorted(repeated, key=lambda t: t["id"]):
+                first = entry["first"].decode() if entry["first"] else None
+                last = entry["last"].decode() if entry["last"] else None
+                self._write(f"[compacted] #{entry['id']}: {entry['count']} "
+                            f"occurrences, first at {first}, last at "
+                            f"{last}\n".encode())
+        return {"original_size": self.input_size,
+                "compacted_size": self.output_size,
+                "compaction_ratio": round(self.input_size /
+                                          self.output_size, 2)
+                if self.output_size else None,
+                "entries": self.entries,
+                "collapsed_entries": self.collapsed_entries}
+
+
+def compact_log(source: Union[str, FileSegment], output_file: str,
+                max_tracked: int = 1024,
+                redactor: Optional[Redactor] = None) -> dict:
+    """
+    Write a compacted copy of a log file (or segment) in a single pass
+    :param source: path to the log file or FileSegment to compact
+    :param output_file: path to write the compacted log to
+    :param max_tracked: max number of distinct multi-line entries to track
+    :param redactor: optional Redactor to apply to the compacted log in the
+        same pass
+    :returns: dict compaction statistics (sizes are before redaction)
+    """
+    segment = as_segment(source)
+    with open_log(segment.path) as f, open(output_file, 'wb') as output:
+        f.seek(segment.start)
+        writer = RedactingWriter(output, redactor) if redactor else output
+        compactor = LogCompactor(writer, max_tracked)
+        remaining = segment.size
+        while remaining > 0:
+            line = f.readline(min(MAX_LINE_LENGTH, remaining))
+            if not line:
+                break
+            remaining -= len(line)
+            compactor.feed(line)
+        stats = compactor.close()
+        if redactor:
+            writer.close()
+        return stats
@@ -0,0 +1,418 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import re
+
+from datetime import datetime
+from glob import glob, escape as glob_escape
+from os.path import basename, getmtime, getsize
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+
+# Leading timestamp of a log entry, i.e. `2025-01-01 12:00:00.000 - ...`
+LOG_TIMESTAMP_PATTERN = re.compile(
+    rb"^(\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2})(?:[.,](\d{1,6}))?")
+# Max bytes to read per line while looking for a timestamp
+MAX_LINE_LENGTH = 65536
+# Active or rotated log file, i.e. `skills.log`, `skills.log.1`,
+# `skills.log.2.gz`
+LOG_FILE_PATTERN = re.compile(
+    r"^(?P<base>.+\.log)(?:\.(?P<index>\d+))?(?P<gz>\.gz)?$")
+
+
+def is_compressed_log(path: str) -> bool:
+    """
+    Check if a path is a gzip-compressed rotated log, i.e. `skills.log.2.gz`.
+    Other gzip files (i.e. bundle archives) are read as-is.
+    """
+    match = LOG_FILE_PATTERN.match(basename(path))
+    return bool(match and match.group("gz"))
+
+
+def open_log(path: str) -> BinaryIO:
+    """
+    Open a log file for binary reading, transparently decompressing
+    compressed rotated logs. Decompression is streamed as the file is read.
+    :param path: path to the log file
+    :returns: readable binary file object
+    """
+    if is_compressed_log(path):
+        # Imported here to keep skill load time down
+        import gzip
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def get_log_size(path: str) -> int:
+    """
+    Get the (uncompressed) size of a log file. The size of a compressed log is
+    read from its trailer without decompressing it.
+    :param path: path to the log file
+    :returns: size in bytes of the log contents
+    """
+    if not is_compressed_log(path):
+        return getsize(path)
+    with open(path, 'rb') as f:
+        f.seek(-4, 2)
+        # Trailer holds the size modulo 2^32, which is fine for rotated logs
+        return int.from_bytes(f.read(4), 'little')
+
+
+def is_log_file(path: str) -> bool:
+    """
+    Check if a path is an active or rotated log file
+    """
+    return LOG_FILE_PATTERN.match(basename(path)) is not None
+
+
+def get_log_base(path: str) -> str:
+    """
+    Get the name of the active log for an active or rotated log file
+    :param path: path to a log file, i.e. `/logs/skills.log.2.gz`
+    :returns: base log name, i.e. `skills.log`
+    """
+    match = LOG_FILE_PATTERN.match(basename(path))
+    return match.group("base") if match else basename(path)
+
+
+def get_attachment_name(path: str) -> str:
+    """
+    Get a plaintext attachment name for a file
+    :param path: path to a file, i.e. `/logs/skills.log.2.gz`
+    :returns: attachment name, i.e. `skills_log.2.txt`
+    """
+    match = LOG_FILE_PATTERN.match(basename(path))
+    if not match:
+        return basename(path)
+    name = match.group("base")[:-len('.log')]
+    index = f".{match.group('index')}" if match.group("index") else ""
+    return f"{name}_log{index}.txt"
+
+
+def find_rotated_logs(log_file: str) -> List[str]:
+    """
+    Find rotated siblings of a log file, i.e. `skills.log.1` and
+    `skills.log.2.gz` for `skills.log`
+    :param log_file: path to an active log file
+    :returns: list of rotated log paths, newest first
+    """
+    rotated = list()
+    for file in glob(f"{glob_escape(log_file)}.*"):
+        match = LOG_FILE_PATTERN.match(basename(file))
+        if match and match.group("index") and \
+                match.group("base") == basename(log_file):
+            rotated.append((-getmtime(file), int(match.group("index")), file))
+    return [file for _, _, file in sorted(rotated)]
+
+
+class FileSegment:
+    """
+    Read-only view of a byte range of a file. Reading a segment never
+    modifies the underlying file and only holds the requested range in memory.
+    Offsets into compressed rotated logs refer to the decompressed contents;
+    any other file is read as-is.
+    """
+    def __init__(self, path: str, start: int = 0, end: Optional[int] = None):
+        """
+        :param path: path to the file
+        :param start: byte offset of the start of the segment
+        :param end: byte offset of the end of the segment (default EOF)
+        """
+        self.path = path
+        self.start = start
+        self.end = get_log_size(path) if end is None else end
+
+    @property
+    def size(self) -> int:
+        return max(self.end - self.start, 0)
+
+    def read(self) -> bytes:
+        """
+        Read the full contents of this segment
+        """
+        with open_log(self.path) as f:
+            f.seek(self.start)
+            return f.read(self.size)
+
+    def copy_to(self, output_file: str):
+        """
+        Write the contents of this segment to a new file. Uncompressed files
+        are copied in the kernel where supported (`copy_file_range`, which
+        shares extents on reflink-capable filesystems, then `sendfile`) so the
+        data is never read into userspace.
+        :param output_file: path to the file to write
+        """
+        with open(output_file, 'wb') as f:
+            if is_compressed_log(self.path) or \
+                    not _copy_range(self.path, f, self.start, self.size):
+                for chunk in self.iter_chunks():
+                    f.write(chunk)
+
+    def iter_chunks(self, chunk_size: int = 65536) -> Iterator[bytes]:
+        """
+        Iterate over the contents of this segment in chunks
+        :param chunk_size: max number of bytes to yield at a time
+        """
+        with open_log(self.path) as f:
+            f.seek(self.start)
+            remaining = self.size
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+
+def _copy_range(path: str, output: BinaryIO, start: int, size: int) -> bool:
+    """
+    Copy a byte range of a file to an empty output file using the cheapest
+    kernel copy available.
+    :param path: path to the file to copy from
+    :param output: empty binary file object to write to
+    :param start: byte offset to copy from
+    :param size: number of bytes to copy
+    :returns: True if the range was copied, False if no kernel copy is
+        supported and nothing was written
+    """
+    with open(path, 'rb') as f:
+        for method in (getattr(os, "copy_file_range", None),
+                       getattr(os, "sendfile", None)):
+            if method is None:
+                continue
+            offset = start
+            remaining = size
+            try:
+                while remaining > 0:
+                    if method is os.sendfile:
+                        copied = method(output.fileno(), f.fileno(), offset,
+                                        remaining)
+                    else:
+                        copied = method(f.fileno(), output.fileno(),
+                                        remaining, offset)
+                    if not copied:
+                        # Source file was truncated
+                        break
+                    offset += copied
+                    remaining -= copied
+                return True
+            except OSError:
+                if offset != start:
+                    raise
+                # Not supported between these files; try the next method
+    return False
+
+
+def as_segment(source: Union[str, FileSegment]) -> FileSegment:
+    """
+    Get a FileSegment for a file path or existing segment
+    """
+    return source if isinstance(source, FileSegment) else FileSegment(source)
+
+
+def get_tail_segment(source: Union[str, FileSegment], max_bytes: int,
+                     chunk_size: int = 4096) -> FileSegment:
+    """
+    Get a segment containing at most the last `max_bytes` of a file (or
+    segment), starting at a line boundary. The cut point is found by seeking
+    from the end of the file, so memory use does not depend on file size.
+    :param source: path to the file or FileSegment to read
+    :param max_bytes: maximum size of the returned segment
+    :param chunk_size: number of bytes to read at a time looking for a newline
+    :returns: FileSegment for the tail of the file
+    """
+    source = as_segment(source)
+    path, end = source.path, source.end
+    if source.size <= max_bytes:
+        return source
+    start = end - max_bytes
+    with open_log(path) as f:
+        f.seek(start - 1)
+        if f.read(1) == b'\n':
+            return FileSegment(path, start, end)
+        position = start
+        while position < end:
+            chunk = f.read(min(chunk_size, end - position))
+            if not chunk:
+                break
+            newline = chunk.find(b'\n')
+            if newline != -1 and position + newline + 1 < end:
+                return FileSegment(path, position + newline + 1, end)
+            position += len(chunk)
+    # No complete line in the retained window; keep the raw tail
+    return FileSegment(path, start, end)
+
+
+def get_head_segment(source: Union[str, FileSegment], max_bytes: int,
+                     chunk_size: int = 4096) -> FileSegment:
+    """
+    Get a segment containing at most the first `max_bytes` of a file (or
+    segment), ending at a line boundary. The cut point is found by seeking
+    back from `max_bytes`, so memory use does not depend on file size.
+    :param source: path to the file or FileSegment to read
+    :param max_bytes: maximum size of the returned segment
+    :param chunk_size: number of bytes to read at a time looking for a newline
+    :returns: FileSegment for the head of the file
+    """
+    source = as_segment(source)
+    path, start = source.path, source.start
+    if source.size <= max_bytes:
+        return source
+    end = start + max_bytes
+    with open_log(path) as f:
+        position = end
+        while position > start:
+            read_start = max(position - chunk_size, start)
+            f.seek(read_start)
+            newline = f.read(position - read_start).rfind(b'\n')
+            if newline != -1:
+                return FileSegment(path, start, read_start + newline + 1)
+            position = read_start
+    # No complete line in the retained window; keep the raw head
+    return FileSegment(path, start, end)
+
+
+def parse_log_timestamp(line: bytes) -> Optional[datetime]:
+    """
+    Parse the leading timestamp of a log line
+    :param line: raw log line
+    :returns: parsed timestamp, or None if the line has no leading timestamp
+    """
+    match = LOG_TIMESTAMP_PATTERN.match(line)
+    if not match:
+        return None
+    try:
+        timestamp = datetime.strptime(match.group(1).decode().replace('T', ' '),
+                                      "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return None
+    if match.group(2):
+        fraction = match.group(2).decode()
+        timestamp = timestamp.replace(microsecond=int(fraction.ljust(6, '0')))
+    return timestamp
+
+
+def _find_entry(f: BinaryIO, offset: int,
+                end: int) -> Tuple[int, Optional[datetime]]:
+    """
+    Find the first timestamped line starting at or after `offset`
+    :returns: tuple of line start offset and timestamp, or (`end`, None)
+    """
+    if offset > 0:
+        f.seek(offset - 1)
+        if f.read(1) != b'\n':
+            # Skip the remainder of a partial line
+            while True:
+                line = f.readline(MAX_LINE_LENGTH)
+                if not line or line.endswith(b'\n'):
+                    break
+    else:
+        f.seek(0)
+    position = f.tell()
+    while position < end:
+        line = f.readline(MAX_LINE_LENGTH)
+        if not line:
+            break
+        timestamp = parse_log_timestamp(line)
+        if timestamp:
+            return position, timestamp
+        position += len(line)
+    return end, None
+
+
+def _bisect_log(f: BinaryIO, target: datetime, size: int,
+                inclusive: bool = True) -> int:
+    """
+    Binary search a log file for the first entry at (or after, if not
+    `inclusive`) the target time. Entries are assumed to be in time order.
+    :returns: byte offset of the first matching entry, or `size` if none match
+    """
+    low, high = 0, size
+    # Entries starting before `low` are before the target and the first entry
+    # starting at or after `high` is not
+    while low < high:
+        middle = (low + high) // 2
+        position, timestamp = _find_entry(f, middle, high)
+        if timestamp is None or timestamp > target or \
+                (inclusive and timestamp == target):
+            high = middle
+        else:
+            low = position + 1
+    if not low:
+        # Every entry matches; include any leading lines without a timestamp
+        return 0
+    return _find_entry(f, low, size)[0]
+
+
+def _scan_window(path: str, start: datetime, end: datetime) -> FileSegment:
+    """
+    Find a time window in a log by reading it sequentially, stopping at the
+    end of the window. Used for compressed logs, which can't seek backwards
+    without decompressing from the beginning.
+    """
+    start_offset = None
+    position = 0
+    first_entry = True
+    with open_log(path) as f:
+        for line in f:
+            timestamp = parse_log_timestamp(line)
+            if timestamp:
+                if timestamp > end:
+                    break
+                if start_offset is None and timestamp >= start:
+                    start_offset = 0 if first_entry else position
+                first_entry = False
+            position += len(line)
+    if start_offset is None:
+        return FileSegment(path, position, position)
+    return FileSegment(path, start_offset, position)
+
+
+def get_time_window_segment(path: str, start: datetime,
+                            end: datetime) -> FileSegment:
+    """
+    Get a segment containing the log entries between `start` and `end`. The
+    log is binary searched by leading timestamps, so only a few lines are
+    read regardless of file size. Compressed logs are scanned only as far as
+    the end of the window, and skipped if last modified before the window.
+    Lines without a timestamp (i.e. tracebacks) are kept with the preceding
+    entry.
+    :param path: path to the log file
+    :param start: earliest entry time to include
+    :param end: latest entry time to include
+    :returns: FileSegment for the requested window
+    """
+    if is_compressed_log(path):
+        if datetime.fromtimestamp(getmtime(path)) < start:
+            return FileSegment(path, 0, 0)
+        return _scan_window(path, start, end)
+    size = getsize(path)
+    with open(path, 'rb') as f:
+        start_offset = _bisect_log(f, start, size)
+        end_offset = _bisect_log(f, end, size, inclusive=False)
+    return FileSegment(path, start_offset, max(start_offset, end_offset))
@@ -0,0 +1,296 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+
+from hashlib import sha256
+from os import listdir, makedirs, remove, replace
+from os.path import isfile, join
+from threading import Event, Lock, Thread
+from time import time
+from typing import Callable, Dict, Optional
+
+from ovos_utils.log import LOG
+
+# Attempts at delivering an email with attachments before falling back to
+# sending it without attachments
+MAX_ATTEMPTS = 8
+# Seconds to wait before the first retry, doubled for each failed attempt
+RETRY_DELAY = 30
+MAX_RETRY_DELAY = 3600
+# Number of delivered email IDs remembered to reject duplicates
+MAX_DELIVERED = 256
+
+
+def get_email_id(recipient: str, subject: str, body: str,
+                 attachments: Optional[Dict[str, str]] = None) -> str:
+    """
+    Get an ID identifying the contents of an email
+    :returns: hex digest of the email contents
+    """
+    digest = sha256()
+    for value in (recipient, subject, body):
+        digest.update(value.encode())
+        digest.update(b"\0")
+    for name, content in sorted((attachments or {}).items()):
+        digest.update(name.encode())
+        digest.update(b"\0")
+        digest.update(content.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class Outbox:
+    """
+    Persistent queue of emails delivered by a background worker. Each email
+    is written to disk once when queued and delivery is retried with
+    exponential backoff, so queued emails survive a restart. Emails that
+    still fail after `max_attempts` are sent once more without attachments
+    and then dropped.
+    """
+    def __init__(self, path: str, send: Callable[..., bool],
+                 max_attempts: int = MAX_ATTEMPTS,
+                 retry_delay: float = RETRY_DELAY,
+                 max_retry_delay: float = MAX_RETRY_DELAY,
+                 on_delivered: Optional[Callable[[dict], None]] = None):
+        """
+        :param path: directory to persist queued emails to
+        :param send: function accepting `title`, `body`, `email_addr` and
+            `attachments` keyword arguments, returning True if the email was
+            sent
+        :param max_attempts: number of attempts to deliver an email
+        :param retry_delay: seconds to wait before the first retry
+        :param max_retry_delay: maximum seconds to wait between retries
+        :param on_delivered: function called with the `metadata` of an email
+            once it is delivered with its attachments
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._send = send
+        self._on_delivered = on_delivered
+        self._lock = Lock()
+        self._wake = Event()
+        self._stopping = Event()
+        self._thread: Optional[Thread] = None
+        self._delivered = list()
+        self._sent_count = 0
+        self._failed_count = 0
+        makedirs(path, exist_ok=True)
+        self._queue = self._load()
+
+    def _load(self) -> Dict[str, dict]:
+        queue = dict()
+        for name in listdir(self.path):
+            if not name.endswith(".state.json"):
+                continue
+            try:
+                with open(join(self.path, name)) as f:
+                    state = json.load(f)
+                if isfile(self._get_email_file(state["id"])):
+                    queue[state["id"]] = state
+            except Exception as e:
+                LOG.error(f"Failed to load queued email {name}: {e}")
+        if queue:
+            LOG.info(f"Loaded {len(queue)} queued emails")
+        return queue
+
+    def _get_email_file(self, email_id: str) -> str:
+        return join(self.path, f"{email_id}.json")
+
+    def _get_state_file(self, email_id: str) -> str:
+        return join(self.path, f"{email_id}.state.json")
+
+    @staticmethod
+    def _write_json(path: str, data: dict):
+        tmp_file = f"{path}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(data, f)
+        replace(tmp_file, path)
+
+    def enqueue(self, title: str, body: str, email_addr: str,
+                attachments: Optional[Dict[str, str]] = None,
+                metadata: Optional[dict] = None) -> str:
+        """
+        Queue an email for delivery. An email that is already queued or was
+        recently delivered is not queued again.
+        :param title: email subject
+        :param body: email body
+        :param email_addr: recipient email address
+        :param attachments: dict of attachment names to B64 contents
+        :param metadata: optional data passed to `on_delivered`
+        :returns: ID of the queued email
+        """
+        email_id = get_email_id(email_addr, title, body, attachments)
+        with self._lock:
+            if email_id in self._queue or email_id in self._delivered:
+                LOG.info(f"Email {email_id} already queued")
+                return email_id
+            self._write_json(self._get_email_file(email_id),
+                             {"title": title, "body": body,
+                              "email_addr": email_addr,
+                              "attachments": attachments})
+            state = {"id": email_id, "queued": time(), "attempts": 0,
+                     "next_attempt": 0, "last_error": None,
+                     "metadata": metadata}
+            self._write_json(self._get_state_file(email_id), state)
+            self._queue[email_id] = state
+        LOG.info(f"Queued email {email_id}")
+        self._wake.set()
+        return email_id
+
+    def get_metrics(self, now: Optional[float] = None) -> dict:
+        """
+        Get metrics describing the state of the queue
+        :param now: epoch time to compute ages from (default current time)
+        :returns: dict queue depth, age in seconds of the oldest and newest
+            queued emails, total delivery attempts of queued emails and
+            counts of emails sent or dropped since load
+        """
+        now = now or time()
+        with self._lock:
+            queued = [state["queued"] for state in self._queue.values()]
+            attempts = sum(state["attempts"] for state in self._queue.values())
+        return {"depth": len(queued),
+                "oldest_age": now - min(queued) if queued else None,
+                "newest_age": now - max(queued) if queued else None,
+                "attempts": attempts,
+                "sent": self._sent_count,
+                "failed": self._failed_count}
+
+    def start(self):
+        """
+        Start delivering queued emails in a background thread
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        """
+        Stop the background worker. Queued emails remain on disk.
+        :param timeout: max seconds to wait for an in-progress delivery
+        """
+        self._stopping.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.clear()
+            delay = self.process()
+            self._wake.wait(delay)
+
+    def process(self, now: Optional[float] = None) -> Optional[float]:
+        """
+        Attempt delivery of all queued emails that are due
+        :param now: epoch time to compare retry times to (default current
+            time)
+        :returns: seconds until the next email is due, None if the queue is
+            empty
+        """
+        with self._lock:
+            due = sorted((state for state in self._queue.values()
+                          if state["next_attempt"] <= (now or time())),
+                         key=lambda s: s["queued"])
+        for state in due:
+            if self._stopping.is_set():
+                break
+            self._deliver(state, now)
+        with self._lock:
+            if not self._queue:
+                return None
+            return max(min(s["next_attempt"] for s in self._queue.values()) -
+                       (now or time()), 0)
+
+    def _deliver(self, state: dict, now: Optional[float] = None):
+        email_id = state["id"]
+        try:
+            with open(self._get_email_file(email_id)) as f:
+                email = json.load(f)
+        except Exception as e:
+            LOG.error(f"Dropping unreadable email {email_id}: {e}")
+            self._remove(email_id)
+            return
+        state["attempts"] += 1
+        try:
+            sent = self._send(**email)
+            error = None if sent else "send failed"
+        except Exception as e:
+            sent = False
+            error = repr(e)
+        if not sent and state["attempts"] >= self.max_attempts and \
+                email.get("attachments"):
+            LOG.error(f"Failed to send {email_id} {state['attempts']} times, "
+                      f"retrying without attachments")
+            email["attachments"] = None
+            try:
+                sent = self._send(**email)
+            except Exception as e:
+                LOG.error(e)
+        if sent:
+            LOG.info(f"Sent email {email_id}")
+            self._sent_count += 1
+            self._remove(email_id, delivered=True)
+            if self._on_delivered and state.get("metadata") is not None and \
+                    email.get("attachments"):
+                try:
+                    self._on_delivered(state["metadata"])
+                except Exception as e:
+                    LOG.error(f"Delivery callback failed for {email_id}: {e}")
+        elif state["attempts"] >= self.max_attempts:
+            LOG.error(f"Dropping email {email_id} after {state['attempts']} "
+                      f"attempts: {error}")
+            self._failed_count += 1
+            self._remove(email_id)
+        else:
+            delay = min(self.retry_delay * 2 ** (state["attempts"] - 1),
+                        self.max_retry_delay)
+            LOG.warning(f"Failed to send {email_id} ({error}); retrying in "
+                        f"{delay}s")
+            state["next_attempt"] = (now or time()) + delay
+            state["last_error"] = error
+            with self._lock:
+                self._write_json(self._get_state_file(email_id), state)
+
+    def _remove(self, email_id: str, delivered: bool = False):
+        with self._lock:
+            self._queue.pop(email_id, None)
+            if delivered:
+                self._delivered = \
+                    self._delivered[-(MAX_DELIVERED - 1):] + [email_id]
+            for file in (self._get_state_file(email_id),
+                         self._get_email_file(email_id)):
+                try:
+                    remove(file)
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,114 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import sys
+
+from importlib.metadata import distributions
+from os import stat
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+from ovos_utils.log import LOG
+
+
+class PackageInventory:
+    """
+    In-process inventory of installed Python distributions. Results are cached
+    and only re-read when a directory on the search path has been modified
+    (i.e. a distribution was installed, removed, or upgraded).
+    """
+    def __init__(self, paths: Optional[List[str]] = None):
+        """
+        :param paths: optional list of directories to search; defaults to
+            `sys.path` at the time of each lookup
+        """
+        self._paths = paths
+        self._lock = Lock()
+        self._signature = None
+        self._packages = list()
+
+    @property
+    def search_paths(self) -> List[str]:
+        return list(self._paths or sys.path)
+
+    def _get_signature(self, paths: List[str]) -> tuple:
+        """
+        Get a signature of the search path that changes whenever an entry is
+        added to or removed from any directory on it
+        """
+        signature = list()
+        for path in paths:
+            try:
+                signature.append((path, stat(path or '.').st_mtime_ns))
+            except OSError:
+                continue
+        return tuple(signature)
+
+    @property
+    def packages(self) -> List[Tuple[str, str]]:
+        """
+        Get a sorted list of (name, version) for installed distributions.
+        """
+        with self._lock:
+            paths = self.search_paths
+            signature = self._get_signature(paths)
+            if signature != self._signature:
+                LOG.debug("Reading installed package metadata")
+                self._packages = self._read_packages(paths)
+                self._signature = signature
+            return list(self._packages)
+
+    @staticmethod
+    def _read_packages(paths: List[str]) -> List[Tuple[str, str]]:
+        packages = dict()
+        for dist in distributions(path=paths):
+            name = dist.metadata["Name"]
+            if not name:
+                continue
+            # Like `pip list`, the first distribution on the path wins
+            key = name.lower().replace('_', '-')
+            if key not in packages:
+                packages[key] = (name, dist.version or "")
+        return sorted(packages.values(), key=lambda p: p[0].lower())
+
+    def as_dict(self) -> Dict[str, str]:
+        """
+        Get a dict of installed distribution names to versions
+        """
+        return dict(self.packages)
+
+    def format_pip_list(self) -> str:
+        """
+        Format installed distributions like the output of `pip list`
+        """
+        packages = [("Package", "Version")] + self.packages
+        name_width = max(len(name) for name, _ in packages)
+        version_width = max(len(version) for _, version in packages)
+        packages.insert(1, ('-' * name_width, '-' * version_width))
+        return '\n'.join(f"{name.ljust(name_width)} {version}".rstrip()
+                         for name, version in packages) + '\n'
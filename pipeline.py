@@ -0,0 +1,121 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from threading import Condition
+from typing import Callable, Iterator, List, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Upper bound on automatically sized pools; attachment work is mostly I/O
+# and a few workers saturate storage on typical devices
+MAX_WORKERS = 4
+# Default ceiling on memory used by concurrent attachment encoding
+MEMORY_LIMIT = 67108864
+
+
+def get_worker_count(workers: int = 0) -> int:
+    """
+    Get the number of workers to process attachments with
+    :param workers: configured number of workers; 0 for one per CPU, up to
+        `MAX_WORKERS`
+    :returns: number of workers, 1 on single-core hardware
+    """
+    cpus = os.cpu_count() or 1
+    if cpus <= 1:
+        return 1
+    return max(int(workers), 1) if workers else min(cpus, MAX_WORKERS)
+
+
+class MemoryBudget:
+    """
+    Ceiling on the combined memory of concurrent tasks. A task larger than
+    the limit may run once no other task holds memory.
+    """
+    def __init__(self, limit: int):
+        """
+        :param limit: maximum bytes reserved at once
+        """
+        self.limit = limit
+        self.in_use = 0
+        self._condition = Condition()
+
+    @contextmanager
+    def reserve(self, size: int) -> Iterator[int]:
+        """
+        Wait until `size` bytes are available and hold them
+        :param size: estimated bytes the task will use
+        :returns: number of bytes reserved
+        """
+        size = min(max(size, 0), self.limit)
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self.in_use + size <= self.limit)
+            self.in_use += size
+        try:
+            yield size
+        finally:
+            with self._condition:
+                self.in_use -= size
+                self._condition.notify_all()
+
+
+def map_ordered(func: Callable[[T], R], items: Sequence[T],
+                workers: int = 1, memory_limit: int = 0,
+                get_size: Optional[Callable[[T], int]] = None) -> List[R]:
+    """
+    Apply a function to items on a bounded thread pool
+    :param func: function to apply to each item
+    :param items: items to process
+    :param workers: maximum number of items to process at once; 1 to
+        process items serially on the calling thread
+    :param memory_limit: optional ceiling on the combined estimated memory
+        of items being processed at once
+    :param get_size: function returning the estimated memory needed to
+        process an item, required with `memory_limit`
+    :returns: results in the order of `items`. The first exception raised,
+        in the order of `items`, is raised after all items complete.
+    """
+    if workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    budget = MemoryBudget(memory_limit) if memory_limit and get_size \
+        else None
+
+    def _run(item: T) -> R:
+        if not budget:
+            return func(item)
+        with budget.reserve(get_size(item)):
+            return func(item)
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as pool:
+        futures = [pool.submit(_run, item) for item in items]
+    return [future.result() for future in futures]
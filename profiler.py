@@ -0,0 +1,229 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import sys
+
+from collections import Counter
+from threading import Event, Lock, Thread, enumerate as enumerate_threads, \
+    get_ident
+from time import monotonic, thread_time
+from typing import Dict, Iterable, Optional
+from uuid import uuid4
+
+from ovos_bus_client import Message
+from ovos_utils.log import LOG
+
+# Request for a service to profile itself; responses include `service`
+PROFILE_REQUEST = "neon.support.profile"
+# Request to stop sampling for a `request_id` early
+PROFILE_CANCEL = f"{PROFILE_REQUEST}.cancel"
+MAX_PROFILE_SECONDS = 30
+MAX_SAMPLE_RATE = 100
+SAMPLE_RATE = 20
+# Maximum fraction of one CPU to spend sampling; the sample rate is reduced
+# if taking a sample costs more than this
+OVERHEAD_BUDGET = 0.02
+
+
+def _get_frame_name(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def sample_stacks(duration: float, rate: float = SAMPLE_RATE,
+                  stop: Optional[Event] = None,
+                  overhead_budget: float = OVERHEAD_BUDGET) -> dict:
+    """
+    Periodically sample the stacks of all threads in this process, except
+    the calling thread
+    :param duration: seconds to sample for
+    :param rate: samples per second
+    :param stop: optional Event to stop sampling early
+    :param overhead_budget: maximum fraction of one CPU to spend sampling
+    :returns: dict of `stacks` (Counter of collapsed stacks, rooted at the
+        thread name), number of `samples`, actual `duration` and sampling
+        `overhead_percent`
+    """
+    stop = stop or Event()
+    own_thread = get_ident()
+    stacks = Counter()
+    samples = 0
+    cpu_seconds = 0.0
+    start = monotonic()
+    end = start + duration
+    while monotonic() < end and not stop.is_set():
+        sample_start = monotonic()
+        start_cpu = thread_time()
+        names = {thread.ident: thread.name for thread in enumerate_threads()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread:
+                continue
+            stack = list()
+            while frame:
+                stack.append(_get_frame_name(frame))
+                frame = frame.f_back
+            stack.append(names.get(thread_id, str(thread_id)))
+            stacks[";".join(reversed(stack))] += 1
+        samples += 1
+        cost = thread_time() - start_cpu
+        cpu_seconds += cost
+        delay = max(1 / rate, cost / overhead_budget)
+        stop.wait(max(min(sample_start + delay, end) - monotonic(), 0))
+    elapsed = monotonic() - start
+    return {"stacks": stacks, "samples": samples,
+            "duration": round(elapsed, 3),
+            "overhead_percent": round(100 * cpu_seconds / elapsed, 3)
+            if elapsed else None}
+
+
+def format_collapsed(stacks: Dict[str, int]) -> str:
+    """
+    Format stack counts as collapsed stacks, as read by flamegraph tools
+    :param stacks: dict of `;`-separated stacks to sample counts
+    :returns: one `stack count` line per stack
+    """
+    return "".join(f"{stack} {count}\n"
+                   for stack, count in sorted(stacks.items()))
+
+
+class ProfileResponder:
+    """
+    Responds to `PROFILE_REQUEST` messages for a service by sampling the
+    stacks of the current process. Sampling runs in its own thread, so the
+    messagebus handler returns immediately, and stops early on a matching
+    `PROFILE_CANCEL`.
+    """
+    def __init__(self, service: str, bus):
+        """
+        :param service: name of the service in this process
+        :param bus: MessageBusClient to respond on
+        """
+        self.service = service
+        self.bus = bus
+        self._lock = Lock()
+        self._request_id = None
+        self._stop = Event()
+
+    def handle_request(self, message: Message):
+        """
+        Handle a request to profile services
+        :param message: Message with `services` to profile, `duration` in
+            seconds and sample `rate`
+        """
+        if self.service not in message.data.get("services", []):
+            return
+        Thread(target=self._profile, args=(message,), daemon=True).start()
+
+    def handle_cancel(self, message: Message):
+        """
+        Handle a request to stop a profile early
+        :param message: Message with the `request_id` of the profile to stop
+        """
+        if message.data.get("request_id") == self._request_id:
+            self._stop.set()
+
+    def _profile(self, message: Message):
+        duration = min(float(message.data.get("duration") or 5),
+                       MAX_PROFILE_SECONDS)
+        rate = min(float(message.data.get("rate") or SAMPLE_RATE),
+                   MAX_SAMPLE_RATE)
+        data = {"service": self.service,
+                "request_id": message.data.get("request_id")}
+        # Only one profile runs at a time to keep overhead bounded
+        if not self._lock.acquire(blocking=False):
+            data["error"] = "Profile already in progress"
+        else:
+            try:
+                self._stop.clear()
+                self._request_id = data["request_id"]
+                profile = sample_stacks(duration, rate, self._stop)
+                data.update({"collapsed": format_collapsed(profile.pop(
+                    "stacks")), "rate": rate, **profile})
+            except Exception as e:
+                LOG.exception(e)
+                data["error"] = repr(e)
+            finally:
+                self._request_id = None
+                self._lock.release()
+        self.bus.emit(message.response(data))
+
+
+def request_profiles(bus, message: Message, services: Iterable[str],
+                     duration: float = 5, rate: float = SAMPLE_RATE,
+                     timeout: float = 5,
+                     stop: Optional[Event] = None) -> Dict[str, dict]:
+    """
+    Request stack profiles from services and wait for their responses
+    :param bus: MessageBusClient to query
+    :param message: Message to forward the request from
+    :param services: names of services to profile
+    :param duration: seconds each service should sample for
+    :param rate: samples per second
+    :param timeout: seconds to wait for responses after `duration`
+    :param stop: optional Event to stop waiting early; services are asked to
+        stop sampling when it is set
+    :returns: dict of service names to profile responses; services that did
+        not respond are omitted, and nothing is returned if stopped
+    """
+    stop = stop or Event()
+    services = set(services)
+    request_id = str(uuid4())
+    results = dict()
+    lock = Lock()
+    complete = Event()
+
+    def _handle_response(response: Message):
+        service = response.data.get("service")
+        if response.data.get("request_id") != request_id:
+            return
+        with lock:
+            if service in services and service not in results:
+                results[service] = response.data
+                if len(results) == len(services):
+                    complete.set()
+
+    bus.on(f"{PROFILE_REQUEST}.response", _handle_response)
+    try:
+        bus.emit(message.forward(PROFILE_REQUEST,
+                                 {"services": sorted(services),
+                                  "duration": duration, "rate": rate,
+                                  "request_id": request_id}))
+        deadline = monotonic() + duration + timeout
+        # Check `stop` between short waits for responses
+        while not complete.wait(min(max(deadline - monotonic(), 0), 0.1)) \
+                and monotonic() < deadline:
+            if stop.is_set():
+                bus.emit(message.forward(PROFILE_CANCEL,
+                                         {"request_id": request_id}))
+                # Services may reply to the cancel with partial profiles
+                return dict()
+    finally:
+        bus.remove(f"{PROFILE_REQUEST}.response", _handle_response)
+    with lock:
+        return dict(results)
@@ -0,0 +1,250 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import re
+
+from typing import BinaryIO, Dict, Iterable, Optional, Union
+
+from .log_utils import FileSegment, as_segment
+
+REDACTED = "[REDACTED]"
+# Patterns of sensitive values in text. Patterns with a `value` group only
+# redact that group, keeping i.e. the name of a `key=value` pair. Patterns
+# must not match across lines.
+TEXT_PATTERNS = {
+    "email": r"[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*"
+             r"\.[A-Za-z]{2,}",
+    "bearer": r"(?i:bearer)[ \t]+(?P<value>[A-Za-z0-9._~+/-]+=*)",
+    "jwt": r"eyJ[A-Za-z0-9_-]{8,}\.[A-Za-z0-9_-]{8,}\.[A-Za-z0-9_-]+",
+    "assignment": r"(?i:\b(?:[a-z0-9]+[_-])*(?:password|passwd|secret|token|"
+                  r"api[_-]?key|access[_-]?key|private[_-]?key|"
+                  r"authorization|credentials?|lat|lng|lon|latitude|"
+                  r"longitude)\b)[\"']?[ \t]*[:=][ \t]*[\"']?"
+                  r"(?:(?i:bearer)[ \t]+)?(?P<value>[^\s\"',;}]+)"
+}
+# Lowercase strings of which every match of `TEXT_PATTERNS` contains at
+# least one. Text without any of these is passed through without running
+# the patterns.
+TRIGGERS = ("@", "eyj", "bearer", "password", "passwd", "secret", "token",
+            "api", "access", "private", "authorization", "credential", "lat",
+            "lng", "lon")
+# Names of keys in structured data whose values are always redacted; each
+# must match a full `_`, `-` or `.` separated part of the key
+SENSITIVE_KEYS = ("password", "passwd", "secret", "token", "api_key",
+                  "apikey", "access_key", "private_key", "auth",
+                  "authorization", "credentials", "email", "lat", "lng",
+                  "lon", "latitude", "longitude", "coordinates", "city",
+                  "address")
+# Bytes of log text to redact at a time; lines longer than this are split
+CHUNK_SIZE = 1048576
+
+
+class Redactor:
+    """
+    Single-pass redaction of sensitive values. All text patterns are
+    compiled into one alternation, so text is scanned once regardless of
+    the number of patterns, and all key rules into one key matcher. Log text
+    is first searched for trigger strings, which is much faster than running
+    the patterns, and only lines containing a trigger are matched.
+    """
+    def __init__(self, patterns: Optional[Dict[str, str]] = None,
+                 keys: Optional[Iterable[str]] = None,
+                 triggers: Optional[Iterable[str]] = None):
+        """
+        :param patterns: dict of names to regex patterns of sensitive text,
+            default `TEXT_PATTERNS`
+        :param keys: names of sensitive keys in structured data,
+            default `SENSITIVE_KEYS`
+        :param triggers: lowercase strings of which every pattern match
+            contains one, default `TRIGGERS` if using default `patterns`,
+            else all lines are matched against `patterns`
+        """
+        if patterns is None:
+            patterns = TEXT_PATTERNS
+            triggers = TRIGGERS if triggers is None else triggers
+        self._triggers = tuple(t.encode() for t in triggers) \
+            if triggers is not None else None
+        keys = SENSITIVE_KEYS if keys is None else keys
+        combined = list()
+        self._value_groups = dict()
+        for idx, pattern in enumerate(patterns.values()):
+            # Group names must be unique within the combined pattern
+            value_group = f"v{idx}"
+            if "(?P<value>" in pattern:
+                self._value_groups[f"p{idx}"] = value_group
+                pattern = pattern.replace("(?P<value>",
+                                          f"(?P<{value_group}>")
+            combined.append(f"(?P<p{idx}>{pattern})")
+        combined = "|".join(combined) or r"(?!)"
+        self._text = re.compile(combined)
+        self._bytes = re.compile(combined.encode())
+        key_names = "|".join(re.escape(key).replace("_", "[_-]?")
+                             for key in keys) or r"(?!)"
+        self._keys = re.compile(rf"(?i)(?:^|[_.-])(?:{key_names})(?:$|[_.-])")
+        self.redactions = 0
+
+    def _replace(self, match: re.Match, redacted):
+        self.redactions += 1
+        value_group = self._value_groups.get(match.lastgroup)
+        if not value_group:
+            return redacted
+        start, end = match.span(value_group)
+        text = match.group(0)
+        offset = match.start()
+        return text[:start - offset] + redacted + text[end - offset:]
+
+    def redact_text(self, text: Union[str, bytes]) -> Union[str, bytes]:
+        """
+        Redact sensitive values in text
+        :param text: str or bytes to redact
+        :returns: redacted text of the same type
+        """
+        if isinstance(text, bytes):
+            if self._triggers is None:
+                return self._redact_bytes(text)
+            return self._redact_triggered(text)
+        return self._text.sub(lambda m: self._replace(m, REDACTED), text)
+
+    def _redact_bytes(self, text: bytes) -> bytes:
+        redacted = REDACTED.encode()
+        return self._bytes.sub(lambda m: self._replace(m, redacted), text)
+
+    def _redact_triggered(self, text: bytes) -> bytes:
+        # `bytes.lower` only changes ASCII letters, so offsets are preserved
+        lower = text.lower()
+        lines = set()
+        for trigger in self._triggers:
+            pos = lower.find(trigger)
+            while pos != -1:
+                start = lower.rfind(b"\n", 0, pos) + 1
+                end = lower.find(b"\n", pos)
+                end = len(lower) if end == -1 else end
+                lines.add((start, end))
+                pos = lower.find(trigger, end)
+        if not lines:
+            return text
+        output = list()
+        pos = 0
+        for start, end in sorted(lines):
+            output.append(text[pos:start])
+            output.append(self._redact_bytes(text[start:end]))
+            pos = end
+        output.append(text[pos:])
+        return b"".join(output)
+
+    def is_sensitive_key(self, key) -> bool:
+        """
+        Check if a key in structured data names a sensitive value
+        """
+        return isinstance(key, str) and self._keys.search(key) is not None
+
+    def redact_data(self, data):
+        """
+        Redact sensitive values in structured data. Containers are only
+        copied along paths that contain a redaction; unchanged data is
+        returned as-is and the input is never modified.
+        :param data: dict, list, tuple or scalar to redact
+        :returns: redacted data
+        """
+        if isinstance(data, str):
+            return self.redact_text(data)
+        if isinstance(data, dict):
+            redacted = None
+            for key, value in data.items():
+                if self.is_sensitive_key(key) and value not in (None, "", [],
+                                                                 {}):
+                    self.redactions += 1
+                    new_value = REDACTED
+                else:
+                    new_value = self.redact_data(value)
+                if new_value is not value:
+                    if redacted is None:
+                        redacted = dict(data)
+                    redacted[key] = new_value
+            return data if redacted is None else redacted
+        if isinstance(data, (list, tuple)):
+            values = [self.redact_data(value) for value in data]
+            if all(new is old for new, old in zip(values, data)):
+                return data
+            return type(data)(values)
+        return data
+
+    def redact_stream(self, source: Iterable[bytes], output: BinaryIO) -> int:
+        """
+        Redact a stream of bytes in one pass with bounded memory. Input is
+        redacted in chunks of complete lines.
+        :param source: iterable of byte chunks
+        :param output: binary stream to write redacted bytes to
+        :returns: number of bytes read from `source`
+        """
+        writer = RedactingWriter(output, self)
+        size = sum(writer.write(chunk) for chunk in source)
+        writer.close()
+        return size
+
+    def redact_file(self, source: Union[str, FileSegment], output_file: str):
+        """
+        Write a redacted copy of a file (or segment), decompressing it if
+        it is a gzip file
+        :param source: path to the file or FileSegment to redact
+        :param output_file: path to write the redacted copy to
+        """
+        with open(output_file, 'wb') as output:
+            self.redact_stream(as_segment(source).iter_chunks(CHUNK_SIZE),
+                               output)
+
+
+class RedactingWriter:
+    """
+    Binary stream wrapper that redacts complete lines before writing them,
+    so a streaming writer (i.e. `LogCompactor`) can be redacted in the same
+    pass. `close` must be called to write any incomplete final line.
+    """
+    def __init__(self, output: BinaryIO, redactor: Redactor):
+        self._output = output
+        self._redactor = redactor
+        self._pending = list()
+        self._pending_size = 0
+
+    def write(self, data: bytes) -> int:
+        self._pending.append(data)
+        self._pending_size += len(data)
+        if self._pending_size >= CHUNK_SIZE:
+            pending = b"".join(self._pending)
+            split = pending.rfind(b"\n") + 1 or len(pending)
+            self._output.write(self._redactor.redact_text(pending[:split]))
+            self._pending = [pending[split:]]
+            self._pending_size = len(pending) - split
+        return len(data)
+
+    def close(self):
+        if self._pending_size:
+            self._output.write(self._redactor.redact_text(
+                b"".join(self._pending)))
+        self._pending = list()
+        self._pending_size = 0
@@ -0,0 +1,401 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+
+from array import array
+from glob import glob
+from math import isnan, nan
+from threading import Event, Lock, Thread
+from time import thread_time, time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ovos_utils.log import LOG
+
+# Seconds between samples
+SAMPLE_INTERVAL = 10
+# Samples retained; one hour at the default interval
+HISTORY_SIZE = 360
+# Maximum fraction of one CPU the sampler may use before its interval is
+# increased
+CPU_BUDGET = 0.005
+MAX_SAMPLE_INTERVAL = 300
+# Samples between scans of /proc for new service processes
+DISCOVERY_SAMPLES = 30
+# Service names mapped to module names in their command lines
+SERVICE_PROCESSES = {
+    "messagebus": ("neon_messagebus",),
+    "speech": ("neon_speech",),
+    "audio": ("neon_audio",),
+    "skills": ("neon_core", "neon_skills"),
+    "gui": ("neon_gui",),
+    "enclosure": ("neon_enclosure", "neon_phal")
+}
+# Service this skill runs in; its own process is always sampled as this
+OWN_SERVICE = "skills"
+SYSTEM_FIELDS = ("load_1m", "mem_available_mb", "swap_used_mb",
+                 "disk_free_mb", "temperature_c")
+PROCESS_FIELDS = ("rss_mb", "cpu_percent")
+# Fields where lower values are worse; others report the maximum value
+_MIN_FIELDS = ("mem_available_mb", "disk_free_mb")
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def _read_file(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def read_loadavg() -> float:
+    """
+    :returns: 1-minute load average, NaN if unavailable
+    """
+    contents = _read_file("/proc/loadavg")
+    return float(contents.split()[0]) if contents else nan
+
+
+def read_meminfo() -> Tuple[float, float]:
+    """
+    :returns: tuple of available memory and used swap in MiB, NaN if
+        unavailable
+    """
+    meminfo = dict()
+    for line in (_read_file("/proc/meminfo") or "").splitlines():
+        key, _, value = line.partition(":")
+        if key in ("MemAvailable", "SwapTotal", "SwapFree"):
+            meminfo[key] = int(value.split()[0]) / 1024
+    swap_used = meminfo["SwapTotal"] - meminfo["SwapFree"] \
+        if "SwapTotal" in meminfo and "SwapFree" in meminfo else nan
+    return meminfo.get("MemAvailable", nan), swap_used
+
+
+def read_disk_free(path: str) -> float:
+    """
+    :param path: path on the filesystem to check
+    :returns: free space available to users in MiB, NaN if unavailable
+    """
+    try:
+        stat = os.statvfs(path)
+    except (OSError, AttributeError):
+        return nan
+    return stat.f_bavail * stat.f_frsize / 1048576
+
+
+def read_temperature() -> float:
+    """
+    :returns: highest thermal zone temperature in degrees C, NaN if
+        unavailable
+    """
+    temperatures = [int(contents) / 1000 for contents in
+                    (_read_file(zone) for zone in
+                     glob("/sys/class/thermal/thermal_zone*/temp"))
+                    if contents and contents.strip().lstrip('-').isdigit()]
+    return max(temperatures) if temperatures else nan
+
+
+def read_process(pid: int) -> Optional[Tuple[float, float]]:
+    """
+    :param pid: process ID to read
+    :returns: tuple of resident memory in MiB and total CPU seconds used,
+        None if the process does not exist
+    """
+    stat = _read_file(f"/proc/{pid}/stat")
+    statm = _read_file(f"/proc/{pid}/statm")
+    if not stat or not statm:
+        return None
+    # Process name may contain spaces; fields after it are fixed
+    fields = stat.rsplit(")", 1)[-1].split()
+    cpu_seconds = (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS
+    return int(statm.split()[1]) * _PAGE_SIZE / 1048576, cpu_seconds
+
+
+def find_processes(processes: Dict[str, Sequence[str]],
+                   own_service: Optional[str] = None) -> \
+        Dict[str, List[int]]:
+    """
+    Find running processes by command line
+    :param processes: dict of names to strings to match in a process's
+        command line, with `-` treated as `_`
+    :param own_service: name to report this process as, regardless of its
+        command line
+    :returns: dict of names to matching process IDs
+    """
+    found = {name: list() for name in processes}
+    own_pid = os.getpid()
+    if own_service:
+        found.setdefault(own_service, list()).append(own_pid)
+    for cmdline_file in glob("/proc/[0-9]*/cmdline"):
+        pid = int(cmdline_file.split("/")[2])
+        cmdline = _read_file(cmdline_file)
+        if (own_service and pid == own_pid) or not cmdline:
+            continue
+        cmdline = cmdline.replace("\0", " ").replace("-", "_")
+        for name, patterns in processes.items():
+            if any(pattern in cmdline for pattern in patterns):
+                found[name].append(pid)
+                break
+    return found
+
+
+class SampleBuffer:
+    """
+    Fixed-size ring buffer of timestamped samples with one preallocated
+    array per field; once full, the oldest sample is overwritten.
+    """
+    def __init__(self, fields: Sequence[str], capacity: int = HISTORY_SIZE):
+        self.fields = tuple(fields)
+        self.capacity = max(int(capacity), 1)
+        self._times = array('d', [0.0]) * self.capacity
+        self._values = {field: array('d', [nan]) * self.capacity
+                        for field in self.fields}
+        self._start = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, timestamp: float, values: Sequence[float]):
+        """
+        Add a sample, overwriting the oldest one if the buffer is full
+        :param timestamp: epoch time of the sample
+        :param values: value of each field, NaN if unavailable
+        """
+        idx = (self._start + self._count) % self.capacity
+        self._times[idx] = timestamp
+        for field, value in zip(self.fields, values):
+            self._values[field][idx] = value
+        if self._count < self.capacity:
+            self._count += 1
+        else:
+            self._start = (self._start + 1) % self.capacity
+
+    def get_samples(self, since: float = 0) -> \
+            Tuple[List[float], Dict[str, List[float]]]:
+        """
+        :param since: epoch time of the oldest sample to return
+        :returns: tuple of sample times and dict of field values, oldest first
+        """
+        indices = [idx for idx in ((self._start + i) % self.capacity
+                                   for i in range(self._count))
+                   if self._times[idx] >= since]
+        return ([self._times[idx] for idx in indices],
+                {field: [values[idx] for idx in indices]
+                 for field, values in self._values.items()})
+
+
+def _summarize(field: str, values: List[float]) -> Optional[float]:
+    values = [value for value in values if not isnan(value)]
+    if not values:
+        return None
+    return round(min(values) if field in _MIN_FIELDS else max(values), 2)
+
+
+def _downsample(times: List[float], values: Dict[str, List[float]],
+                max_points: int) -> dict:
+    step = max(-(-len(times) // max_points), 1)
+    return {"time": [round(times[i]) for i in range(0, len(times), step)],
+            **{field: [_summarize(field, series[i:i + step])
+                       for i in range(0, len(series), step)]
+               for field, series in values.items()}}
+
+
+class ResourceSampler:
+    """
+    Periodically samples system load, memory, swap, disk space, temperature
+    and the memory and CPU use of service processes from /proc into
+    fixed-size buffers. The sampler's own CPU time is measured and the
+    interval is increased if it exceeds `cpu_budget`.
+    """
+    def __init__(self, disk_path: str, interval: float = SAMPLE_INTERVAL,
+                 capacity: int = HISTORY_SIZE,
+                 processes: Optional[Dict[str, Sequence[str]]] = None,
+                 cpu_budget: float = CPU_BUDGET,
+                 own_service: Optional[str] = OWN_SERVICE):
+        """
+        :param disk_path: path to report free disk space for
+        :param interval: seconds between samples
+        :param capacity: number of samples to retain
+        :param processes: dict of process names to command line patterns,
+            default `SERVICE_PROCESSES`
+        :param cpu_budget: maximum fraction of one CPU to use for sampling
+        :param own_service: process name to sample this process as, None to
+            only sample processes matching `processes`
+        """
+        self.disk_path = disk_path
+        self.interval = interval
+        self.cpu_budget = cpu_budget
+        self.own_service = own_service
+        self._processes = processes or SERVICE_PROCESSES
+        self._system = SampleBuffer(SYSTEM_FIELDS, capacity)
+        self._process_samples = {name: SampleBuffer(PROCESS_FIELDS, capacity)
+                                 for name in self._processes}
+        if own_service:
+            self._process_samples.setdefault(
+                own_service, SampleBuffer(PROCESS_FIELDS, capacity))
+        self._pids: Dict[str, List[int]] = dict()
+        self._cpu_times: Dict[int, float] = dict()
+        self._last_sample: Optional[float] = None
+        self._samples_since_discovery = 0
+        self._sample_count = 0
+        self._sample_cpu_seconds = 0.0
+        self._lock = Lock()
+        self._stopping = Event()
+        self._thread: Optional[Thread] = None
+
+    @property
+    def cpu_usage(self) -> Optional[float]:
+        """
+        Mean fraction of one CPU used by sampling at the current interval
+        """
+        if not self._sample_count:
+            return None
+        return self._sample_cpu_seconds / self._sample_count / self.interval
+
+    def sample(self, now: Optional[float] = None):
+        """
+        Record a sample of system and process resources
+        :param now: epoch time of the sample, defaults to now
+        """
+        with self._lock:
+            start_cpu = thread_time()
+            now = time() if now is None else now
+            mem_available, swap_used = read_meminfo()
+            self._system.append(now, (read_loadavg(), mem_available,
+                                      swap_used,
+                                      read_disk_free(self.disk_path),
+                                      read_temperature()))
+            self._sample_processes(now)
+            self._last_sample = now
+            self._sample_count += 1
+            self._sample_cpu_seconds += thread_time() - start_cpu
+
+    def _sample_processes(self, now: float):
+        if not self._pids or \
+                self._samples_since_discovery >= DISCOVERY_SAMPLES:
+            self._pids = find_processes(self._processes, self.own_service)
+            self._samples_since_discovery = 0
+        self._samples_since_discovery += 1
+        elapsed = now - self._last_sample if self._last_sample else None
+        cpu_times = dict()
+        for name, pids in self._pids.items():
+            rss = cpu = 0.0
+            running = False
+            for pid in pids:
+                usage = read_process(pid)
+                if not usage:
+                    # Find a restarted service at the next sample
+                    self._samples_since_discovery = DISCOVERY_SAMPLES
+                    continue
+                running = True
+                rss += usage[0]
+                cpu_times[pid] = usage[1]
+                if elapsed and pid in self._cpu_times:
+                    cpu += (usage[1] - self._cpu_times[pid]) / elapsed * 100
+                else:
+                    cpu = nan
+            self._process_samples[name].append(
+                now, (rss, cpu) if running else (nan, nan))
+        self._cpu_times = cpu_times
+
+    def get_report(self, seconds: float = 3600, max_points: int = 60,
+                   now: Optional[float] = None) -> dict:
+        """
+        Summarize resource use over a recent period
+        :param seconds: number of seconds of history to report
+        :param max_points: maximum number of points in each time series;
+            samples are combined into the worst value of each field
+        :param now: epoch time to report at, defaults to now
+        :returns: dict of sampling `interval` and `sampler_cpu_percent`,
+            `system` time series and `processes` with process IDs, peak
+            values and time series
+        """
+        since = (time() if now is None else now) - seconds
+        with self._lock:
+            times, values = self._system.get_samples(since)
+            processes = {name: (self._pids.get(name, []),
+                                buffer.get_samples(since))
+                         for name, buffer in self._process_samples.items()}
+            cpu_usage = self.cpu_usage
+        report = {"interval": self.interval,
+                  "sampler_cpu_percent": round(cpu_usage * 100, 4)
+                  if cpu_usage is not None else None,
+                  "system": _downsample(times, values, max_points),
+                  "processes": dict()}
+        for name, (pids, (times, values)) in processes.items():
+            if not pids and all(isnan(v) for v in values["rss_mb"]):
+                continue
+            report["processes"][name] = {
+                "pids": pids,
+                **{f"peak_{field}": _summarize(field, series)
+                   for field, series in values.items()},
+                **_downsample(times, values, max_points)}
+        return report
+
+    def start(self):
+        """
+        Start sampling in a background thread
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        """
+        Stop the background sampler
+        :param timeout: max seconds to wait for an in-progress sample
+        """
+        self._stopping.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                LOG.exception(e)
+            self._enforce_budget()
+            self._stopping.wait(self.interval)
+
+    def _enforce_budget(self):
+        """
+        Double the interval, up to `MAX_SAMPLE_INTERVAL`, if sampling uses
+        more than `cpu_budget` at the current interval
+        """
+        if self.cpu_usage and self.cpu_usage > self.cpu_budget and \
+                self.interval < MAX_SAMPLE_INTERVAL:
+            self.interval = min(self.interval * 2, MAX_SAMPLE_INTERVAL)
+            LOG.warning(f"Resource sampling exceeded CPU budget; "
+                        f"interval increased to {self.interval}s")
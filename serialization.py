@@ -0,0 +1,83 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+
+from typing import IO
+
+import yaml
+
+# Formats for structured diagnostic attachments
+DIAGNOSTICS_FORMATS = ("yaml", "jsonl")
+
+# Use the libyaml emitter when PyYAML was built with it
+_BaseDumper = getattr(yaml, "CDumper", yaml.Dumper)
+
+
+class DiagnosticsDumper(_BaseDumper):
+    """
+    YAML dumper that writes repeated objects in full. Diagnostics reference
+    the same dicts in several places (i.e. a user profile in the message
+    context) and aliases would make attachments harder to read.
+    """
+    def ignore_aliases(self, data) -> bool:
+        return True
+
+
+def write_yaml(data, stream: IO[str]):
+    """
+    Serialize data as YAML directly to a stream
+    :param data: object to serialize
+    :param stream: writable text stream
+    """
+    yaml.dump(data, stream, Dumper=DiagnosticsDumper)
+
+
+def write_json_lines(data: dict, stream: IO[str]):
+    """
+    Serialize a dict as compact JSON, one top-level key per line, directly
+    to a stream. Values that aren't JSON serializable are written as strings.
+    :param data: dict to serialize
+    :param stream: writable text stream
+    """
+    for key, value in data.items():
+        json.dump({key: value}, stream, default=str, separators=(",", ":"))
+        stream.write("\n")
+
+
+def write_diagnostics(data: dict, stream: IO[str], fmt: str = "yaml"):
+    """
+    Serialize diagnostic data to a stream
+    :param data: dict to serialize
+    :param stream: writable text stream
+    :param fmt: one of `DIAGNOSTICS_FORMATS`
+    """
+    if fmt == "jsonl":
+        write_json_lines(data, stream)
+    else:
+        write_yaml(data, stream)
@@ -0,0 +1,98 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from threading import Event, Lock
+from time import monotonic
+from typing import Dict, Optional
+
+from ovos_bus_client import Message
+
+# Service names reported in diagnostics mapped to their readiness endpoints
+SERVICE_READY_MESSAGES = {
+    "speech": "mycroft.speech.is_ready",
+    "voice": "mycroft.voice.is_ready",
+    "audio": "mycroft.audio.is_ready",
+    "skills": "mycroft.skills.is_ready",
+    "gui": "mycroft.gui_service.is_ready",
+    "enclosure": "mycroft.PHAL.is_ready",
+    "admin": "mycroft.PHAL.admin.is_ready"
+}
+
+
+def probe_services(bus, message: Message,
+                   services: Optional[Dict[str, str]] = None,
+                   timeout: float = 3.0) -> Dict[str, dict]:
+    """
+    Query service readiness endpoints concurrently. All queries are emitted
+    at once and replies are collected against one shared deadline, so a
+    probe takes about as long as the slowest response (or `timeout`).
+    :param bus: MessageBusClient to query
+    :param message: Message to forward queries from
+    :param services: dict of service names to readiness message types
+    :param timeout: seconds to wait for all services to respond
+    :returns: dict of service name to `status`, `state` and `latency`, where
+        state is one of `ready`, `not_ready` or `timeout`
+    """
+    services = services or SERVICE_READY_MESSAGES
+    results = {name: {"status": None, "state": "timeout", "latency": None}
+               for name in services}
+    pending = set(services)
+    lock = Lock()
+    complete = Event()
+    handlers = dict()
+    start = monotonic()
+
+    def _get_handler(name: str):
+        def _handle_response(response: Message):
+            with lock:
+                if name not in pending:
+                    return
+                pending.remove(name)
+                status = response.data.get("status")
+                results[name] = {
+                    "status": status,
+                    "state": "ready" if status else "not_ready",
+                    "latency": round(monotonic() - start, 3)}
+                if not pending:
+                    complete.set()
+        return _handle_response
+
+    for name, msg_type in services.items():
+        handlers[name] = _get_handler(name)
+        bus.on(f"{msg_type}.response", handlers[name])
+    try:
+        for msg_type in services.values():
+            bus.emit(message.forward(msg_type))
+        complete.wait(timeout)
+    finally:
+        for name, msg_type in services.items():
+            bus.remove(f"{msg_type}.response", handlers[name])
+        with lock:
+            # Ignore any responses still in flight past the deadline
+            pending.clear()
+    return results
@@ -0,0 +1,160 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from datetime import datetime
+from threading import Lock
+from time import time
+from typing import Dict, Optional
+
+from ovos_bus_client import Message
+
+
+def _isoformat(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp).isoformat() \
+        if timestamp else None
+
+
+class SkillRegistry:
+    """
+    In-memory record of skills known to the skills service, populated from
+    a `mycroft.skills.list` response and updated as skills are loaded,
+    fail to load or are shut down. Reading the registry never waits on the
+    skill manager.
+    """
+    def __init__(self):
+        self._lock = Lock()
+        self._skills: Dict[str, dict] = dict()
+        self._listed = False
+        self._updated: Optional[float] = None
+
+    @property
+    def populated(self) -> bool:
+        """
+        True if the skill list or any skill event has been received
+        """
+        return self._updated is not None
+
+    @property
+    def listed(self) -> bool:
+        """
+        True if a complete skill list has been received
+        """
+        return self._listed
+
+    def _get_skill(self, skill_id: str) -> dict:
+        if skill_id not in self._skills:
+            self._skills[skill_id] = {"status": None, "active": False,
+                                      "name": None, "path": None,
+                                      "loaded": None, "failed": None,
+                                      "unloaded": None, "error": None}
+        return self._skills[skill_id]
+
+    def handle_skill_list(self, message: Message):
+        """
+        Handle a `mycroft.skills.list` response from the skill manager
+        :param message: Message with a dict of skill IDs to status
+        """
+        now = time()
+        with self._lock:
+            for skill_id, status in message.data.items():
+                if not isinstance(status, dict):
+                    continue
+                skill = self._get_skill(skill_id)
+                skill["active"] = bool(status.get("active"))
+                if skill["status"] is None:
+                    skill["status"] = "loaded" if skill["active"] \
+                        else "inactive"
+            self._listed = True
+            self._updated = now
+
+    def handle_skill_loaded(self, message: Message):
+        """
+        Handle a `mycroft.skills.loaded` event
+        :param message: Message with the loaded skill `id`, `name` and `path`
+        """
+        now = time()
+        with self._lock:
+            skill = self._get_skill(message.data.get("id"))
+            skill.update({"status": "loaded", "active": True, "loaded": now,
+                          "error": None})
+            for key in ("name", "path"):
+                skill[key] = message.data.get(key) or skill[key]
+            self._updated = now
+
+    def handle_skill_failure(self, message: Message):
+        """
+        Handle a `mycroft.skills.loading_failure` event
+        :param message: Message with the failed skill `id` and `path`
+        """
+        now = time()
+        with self._lock:
+            skill = self._get_skill(message.data.get("id"))
+            skill.update({"status": "failed", "active": False, "failed": now,
+                          "error": message.data.get("error") or
+                          message.data.get("reason") or "loading_failure"})
+            skill["path"] = message.data.get("path") or skill["path"]
+            self._updated = now
+
+    def handle_skill_shutdown(self, message: Message):
+        """
+        Handle a `mycroft.skills.shutdown` event
+        :param message: Message with the unloaded skill `id` and `path`
+        """
+        now = time()
+        with self._lock:
+            skill = self._get_skill(message.data.get("id"))
+            skill.update({"status": "unloaded", "active": False,
+                          "unloaded": now})
+            self._updated = now
+
+    def get_skill_list(self) -> Optional[Dict[str, dict]]:
+        """
+        Get skills in the format of a `mycroft.skills.list` response
+        :returns: dict of skill IDs to `active` and `id`, None if the
+            registry has not been populated
+        """
+        if not self.populated:
+            return None
+        with self._lock:
+            return {skill_id: {"active": skill["active"], "id": skill_id}
+                    for skill_id, skill in self._skills.items()
+                    if skill["status"] != "unloaded"}
+
+    def as_dict(self) -> Dict[str, dict]:
+        """
+        Get the full registry with ISO-formatted event times
+        :returns: dict of skill IDs to `status` (loaded, inactive, failed or
+            unloaded), `active`, `name`, `path`, times the skill was
+            `loaded`, `failed` and `unloaded`, and the last load `error`
+        """
+        with self._lock:
+            return {skill_id: {**skill,
+                               "loaded": _isoformat(skill["loaded"]),
+                               "failed": _isoformat(skill["failed"]),
+                               "unloaded": _isoformat(skill["unloaded"])}
+                    for skill_id, skill in self._skills.items()}
@@ -0,0 +1,510 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Benchmarks for the support bundle pipeline. Synthetic logs of each
+requested size are written to a temporary log directory and a stand-in
+messagebus replies to service status queries with configurable latency.
+Serialization of diagnostics and redaction throughput are measured on
+fixed inputs, the skill import is timed in fresh interpreters and the
+CPU use of resource sampling is measured.
+Results are written as JSON so runs can be compared between versions:
+
+    python test/benchmarks.py --sizes 1MB,100MB,4GB --output results.json
+    python test/benchmarks.py --output new.json --compare results.json
+"""
+
+import json
+import os
+import platform
+import re
+import sys
+
+from argparse import ArgumentParser
+from datetime import datetime, timedelta
+from os.path import getsize, join
+from shutil import rmtree
+from subprocess import run
+from tempfile import mkdtemp
+from threading import Event, Thread, Timer
+from time import perf_counter
+from typing import Callable, Dict, List, Optional
+
+from ovos_bus_client import Message
+from ovos_utils.fakebus import FakeBus
+
+DEFAULT_SIZES = ("1MB", "100MB", "1GB")
+# Service reply latencies in seconds; None never replies
+DEFAULT_LATENCIES = {"speech": 0.05, "voice": 0.05, "audio": 0.2,
+                     "skills": 0.5, "gui": None, "enclosure": 0.01,
+                     "admin": None}
+# Share of the total log size written to each log
+LOG_SHARES = {"skills.log": 0.5, "voice.log": 0.25, "audio.log": 0.25}
+# Relative increase in a metric reported as a regression
+REGRESSION_TOLERANCE = 0.2
+# Copies of the core configuration serialized for serialization cases
+SERIALIZATION_COPIES = 20
+# Size of the in-memory log redacted for redaction cases
+REDACTION_SAMPLE_SIZE = 16 * 1024 ** 2
+# Modules already loaded by the skills service before this skill
+BASE_MODULES = ("neon_utils.skills", "ovos_workshop.decorators",
+                "ovos_bus_client")
+# Fresh interpreters the skill import is timed in; the fastest is reported
+IMPORT_RUNS = 3
+# Resource samples taken to measure the sampler's CPU use
+RESOURCE_SAMPLES = 30
+# Same length as the formatted timestamps that replace it
+_TIMESTAMP = b"0000-00-00 00:00:00"
+_UNITS = {"B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+
+class BenchmarkBus(FakeBus):
+    """
+    Stand-in messagebus that replies to service readiness queries after a
+    configured latency per service, or never to simulate a timeout
+    """
+    def __init__(self, latencies: Optional[Dict[str, Optional[float]]] =
+                 None):
+        """
+        :param latencies: dict of service names to reply latency in seconds,
+            None to never reply
+        """
+        from skill_support_helper.service_status import \
+            SERVICE_READY_MESSAGES
+        FakeBus.__init__(self)
+        # Compatibility with MessageBusClient, as in skill unit tests
+        self.emitter = self.ee
+        self.connected_event = Event()
+        self.connected_event.set()
+        self.latencies = dict(DEFAULT_LATENCIES if latencies is None
+                              else latencies)
+        for service, msg_type in SERVICE_READY_MESSAGES.items():
+            self.on(msg_type, self._get_responder(service))
+
+    def _get_responder(self, service: str) -> Callable[[Message], None]:
+        def _respond(message: Message):
+            latency = self.latencies.get(service)
+            if latency is None:
+                return
+            Timer(latency, self.emit,
+                  (message.response({"status": True}),)).start()
+        return _respond
+
+
+class ResourceMonitor:
+    """
+    Measure peak RSS and bytes written by this process while running code
+    """
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak_rss = 0
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+        self._io_start: Dict[str, int] = dict()
+        self.io: Dict[str, Optional[int]] = dict()
+
+    @staticmethod
+    def _get_rss() -> int:
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except OSError:
+            import resource
+            # Lifetime peak; KiB on Linux
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    @staticmethod
+    def _get_io() -> Dict[str, int]:
+        try:
+            with open("/proc/self/io") as f:
+                return {key: int(value) for key, value in
+                        (line.split(": ") for line in f)}
+        except OSError:
+            return dict()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_rss = max(self.peak_rss, self._get_rss())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak_rss = self._get_rss()
+        self._io_start = self._get_io()
+        self._stop.clear()
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._stop.set()
+        self._thread.join()
+        self.peak_rss = max(self.peak_rss, self._get_rss())
+        io_end = self._get_io()
+        # `wchar` counts bytes passed to write calls (including tmpfs);
+        # `write_bytes` counts bytes sent to storage
+        self.io = {key: io_end[key] - self._io_start[key]
+                   if key in io_end and key in self._io_start else None
+                   for key in ("wchar", "write_bytes")}
+
+
+def parse_size(size: str) -> int:
+    """
+    :param size: size string, i.e. `100MB` or `2GB`
+    :returns: size in bytes
+    """
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)\s*([KMG]?B)", size.strip().upper())
+    if not match:
+        raise ValueError(f"Invalid size: {size}")
+    return int(float(match.group(1)) * _UNITS[match.group(2)])
+
+
+def write_synthetic_log(path: str, size: int,
+                        end_time: Optional[datetime] = None):
+    """
+    Write a log file of roughly `size` bytes ending at `end_time`. Blocks of
+    entries repeat with one second per block and include warnings,
+    tracebacks and sensitive values like a real service log.
+    :param path: path of the log file to write
+    :param size: number of bytes to write
+    :param end_time: time of the last entry, default now
+    """
+    entries = list()
+    ts = _TIMESTAMP.decode()
+    for i in range(64):
+        entries.append(f"{ts}.{i:03d} - skills - INFO - ovos_core.intent_"
+                       f"services:handle_utterance:{i} - Handled utterance "
+                       f"in session default with {i % 5} handlers\n")
+        if i % 16 == 0:
+            entries.append(f"{ts}.{i:03d} - skills - WARNING - Retry {i} "
+                           f"for user test@neon.ai with token=abc{i}\n")
+        if i % 32 == 0:
+            entries.append(f"{ts}.{i:03d} - skills - ERROR - Failed\n"
+                           f"Traceback (most recent call last):\n"
+                           f"  File \"skill.py\", line {i}, in handle\n"
+                           f"ValueError: {i}\n")
+    block = "".join(entries).encode()
+    blocks = max(size // len(block), 1)
+    end_time = end_time or datetime.now()
+    with open(path, 'wb') as f:
+        for i in range(blocks):
+            timestamp = end_time - timedelta(seconds=blocks - i)
+            f.write(block.replace(_TIMESTAMP, timestamp.strftime(
+                "%Y-%m-%d %H:%M:%S").encode()))
+
+
+def measure(name: str, func: Callable[[], int], **params) -> dict:
+    """
+    Run a benchmark case
+    :param name: name of the case
+    :param func: function to benchmark, returning the number of bytes
+        produced
+    :param params: parameters of the case to include in the result
+    :returns: dict result
+    """
+    with ResourceMonitor() as monitor:
+        start = perf_counter()
+        output_bytes = func()
+        wall_time = perf_counter() - start
+    result = {"name": name, **params, "wall_time": round(wall_time, 6),
+              "peak_rss": monitor.peak_rss,
+              "bytes_written": monitor.io.get("wchar"),
+              "disk_bytes_written": monitor.io.get("write_bytes"),
+              "output_bytes": output_bytes}
+    print(json.dumps(result), file=sys.stderr)
+    return result
+
+
+def benchmark_serialization(config: dict) -> List[dict]:
+    """
+    Benchmark writing diagnostics in each `DIAGNOSTICS_FORMATS` and with the
+    pure Python YAML dumper for comparison
+    :param config: configuration to serialize `SERIALIZATION_COPIES` of
+    :returns: list of results
+    """
+    import yaml
+    from copy import deepcopy
+    from io import StringIO
+    from skill_support_helper.serialization import DIAGNOSTICS_FORMATS, \
+        write_diagnostics
+
+    data = {f"section_{i}": deepcopy(dict(config))
+            for i in range(SERIALIZATION_COPIES)}
+
+    def _write(func: Callable[[dict, StringIO], None]) -> int:
+        output = StringIO()
+        func(data, output)
+        return len(output.getvalue())
+
+    results = [measure("serialize_python_yaml", lambda: _write(
+        lambda d, f: yaml.dump(d, f, Dumper=yaml.Dumper)))]
+    for fmt in DIAGNOSTICS_FORMATS:
+        results.append(measure(f"serialize_{fmt}", lambda: _write(
+            lambda d, f: write_diagnostics(d, f, fmt))))
+    return results
+
+
+def benchmark_redaction(redactor) -> List[dict]:
+    """
+    Benchmark single-pass redaction of a log with 1% sensitive lines against
+    applying each of `TEXT_PATTERNS` in turn
+    :param redactor: Redactor to benchmark
+    :returns: list of results
+    """
+    from io import BytesIO
+    from skill_support_helper.redaction import REDACTED, TEXT_PATTERNS
+
+    lines = (b"2025-01-01 12:00:00.123 - skills - INFO - ovos_core.intent_"
+             b"services:handle_utterance:123 - Handled utterance for "
+             b"session default with 4 handlers\n" * 99 +
+             b"2025-01-01 12:00:00.123 - skills - DEBUG - Login for "
+             b"test@neon.ai with api_key=abcdef at lat=47.61\n")
+    log = lines * max(REDACTION_SAMPLE_SIZE // len(lines), 1)
+    chunks = [log[i:i + 65536] for i in range(0, len(log), 65536)]
+
+    def _redact() -> int:
+        output = BytesIO()
+        redactor.redact_stream(chunks, output)
+        return len(output.getvalue())
+
+    def _redact_per_pattern() -> int:
+        redacted = log
+        for pattern in TEXT_PATTERNS.values():
+            redacted = re.sub(pattern.encode(), REDACTED.encode(), redacted)
+        return len(redacted)
+
+    return [measure("redact_stream", _redact, input_bytes=len(log)),
+            measure("redact_per_pattern", _redact_per_pattern,
+                    input_bytes=len(log))]
+
+
+def get_skill_imports() -> List[tuple]:
+    """
+    Import the skill in a fresh interpreter that has already loaded
+    `BASE_MODULES`
+    :returns: list of (module, self_us, cumulative_us) for each module the
+        skill imports, ending with the skill itself
+    """
+    result = run([sys.executable, "-X", "importtime", "-c",
+                  f"import {', '.join(BASE_MODULES)}; "
+                  f"import skill_support_helper"],
+                 capture_output=True, text=True, check=True)
+    # Lines are `import time: self [us] | cumulative | name`, written as each
+    # import completes
+    lines = [line[len("import time:"):].split("|")
+             for line in result.stderr.splitlines()
+             if line.startswith("import time:") and "self [us]" not in line]
+    top_level = [i for i, line in enumerate(lines)
+                 if not line[2].startswith("  ")]
+    return [(line[2].strip(), int(line[0]), int(line[1]))
+            for line in lines[top_level[-2] + 1:]]
+
+
+def benchmark_import() -> List[dict]:
+    """
+    Benchmark importing the skill into a skills service process
+    :returns: list of results
+    """
+    runs = list()
+
+    def _import() -> int:
+        for _ in range(IMPORT_RUNS):
+            runs.append(get_skill_imports())
+        return len(runs[-1])
+
+    result = measure("import_skill", _import, runs=IMPORT_RUNS)
+    # Wall time includes starting each interpreter; this is the skill alone
+    result["import_time"] = min(r[-1][2] for r in runs) / 1000000
+    return [result]
+
+
+def benchmark_resource_sampler(disk_path: str) -> List[dict]:
+    """
+    Benchmark resource sampling, reporting the fraction of one CPU it uses
+    at the default interval to compare with `CPU_BUDGET`
+    :param disk_path: path to sample free disk space for
+    :returns: list of results
+    """
+    from skill_support_helper.resource_sampler import CPU_BUDGET, \
+        ResourceSampler
+
+    sampler = ResourceSampler(disk_path)
+
+    def _sample() -> int:
+        for _ in range(RESOURCE_SAMPLES):
+            sampler.sample()
+        return len(json.dumps(sampler.get_report()))
+
+    result = measure("sample_resources", _sample, samples=RESOURCE_SAMPLES,
+                     cpu_budget=CPU_BUDGET)
+    result["cpu_usage"] = sampler.cpu_usage
+    return [result]
+
+
+def _get_files_size(files: list) -> int:
+    return sum(getsize(f) if isinstance(f, str) else f.size for f in files)
+
+
+def run_benchmarks(sizes: List[int], skill=None,
+                   latencies: Optional[Dict[str, Optional[float]]] = None,
+                   work_dir: Optional[str] = None) -> dict:
+    """
+    Benchmark the support bundle pipeline
+    :param sizes: total sizes in bytes of synthetic logs to benchmark with
+    :param skill: optional SupportSkill to benchmark; by default a skill is
+        created on a `BenchmarkBus`
+    :param latencies: service reply latencies for a created skill's bus
+    :param work_dir: directory to write synthetic logs in (default temporary)
+    :returns: dict of environment info and a list of `results`
+    """
+    from ovos_utils.log import LOG
+    from skill_support_helper import SupportSkill
+    from skill_support_helper.redaction import Redactor
+    from skill_support_helper.version import __version__
+
+    created_skill = skill is None
+    if created_skill:
+        skill = SupportSkill(skill_id="skill-support_helper.benchmark",
+                             bus=BenchmarkBus(latencies))
+    log_dir = mkdtemp(dir=work_dir)
+    real_log_path = LOG.base_path
+    real_profile_seconds = skill.settings.get("profile_seconds")
+    # Profiling waits a fixed duration, which would hide other costs
+    skill.settings["profile_seconds"] = 0
+    message = Message("benchmark", {}, {"username": "benchmark"})
+    profile = {"user": {"username": "benchmark", "email": "test@neon.ai"}}
+    results = list()
+    try:
+        LOG.base_path = log_dir
+        results.append(measure(
+            "check_service_status",
+            lambda: len(json.dumps(skill._check_service_status(message))),
+            timeout=skill.status_timeout))
+        skill._collection_cache.clear()
+        results.append(measure(
+            "get_support_info",
+            lambda: len(json.dumps(skill._get_support_info(message, profile),
+                                   default=str))))
+        results.extend(benchmark_serialization(skill.config_core))
+        results.extend(benchmark_redaction(skill.redactor or Redactor()))
+        results.extend(benchmark_import())
+        results.extend(benchmark_resource_sampler(log_dir))
+        for size in sizes:
+            for name, share in LOG_SHARES.items():
+                write_synthetic_log(join(log_dir, name), int(size * share))
+            skill._collection_cache.clear()
+            info = skill._get_support_info(message, profile)
+            workspace = mkdtemp(dir=work_dir)
+            files = list()
+
+            def _get_attachments():
+                files.extend(skill._get_attachments(info, workspace))
+                return _get_files_size(files)
+
+            results.append(measure("get_attachments", _get_attachments,
+                                   log_size=size))
+            results.append(measure(
+                "parse_attachments",
+                lambda: sum(map(len, skill._parse_attachments(
+                    files, skill.max_log_bytes,
+                    limits=skill._get_attachment_limits(files, "raw"),
+                    workers=skill.attachment_workers,
+                    memory_limit=skill.memory_limit).values())),
+                log_size=size))
+            skill._collection_cache.clear()
+            rmtree(workspace, ignore_errors=True)
+    finally:
+        LOG.base_path = real_log_path
+        if real_profile_seconds is None:
+            skill.settings.pop("profile_seconds", None)
+        else:
+            skill.settings["profile_seconds"] = real_profile_seconds
+        rmtree(log_dir, ignore_errors=True)
+        if created_skill:
+            skill.shutdown()
+    return {"version": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "time": datetime.now().isoformat(),
+            "results": results}
+
+
+def compare_results(current: dict, previous: dict,
+                    tolerance: float = REGRESSION_TOLERANCE) -> List[str]:
+    """
+    Compare benchmark results with a previous run
+    :param current: results of `run_benchmarks`
+    :param previous: earlier results of `run_benchmarks`
+    :param tolerance: relative increase in wall time, peak RSS, import time
+        or sampler CPU use reported as a regression
+    :returns: list of regressions
+    """
+    def _key(result: dict) -> tuple:
+        return result["name"], result.get("log_size")
+
+    previous_results = {_key(r): r for r in previous["results"]}
+    regressions = list()
+    for result in current["results"]:
+        baseline = previous_results.get(_key(result))
+        if not baseline:
+            continue
+        for metric in ("wall_time", "peak_rss", "import_time", "cpu_usage"):
+            if baseline.get(metric) and \
+                    result[metric] > baseline[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{result['name']} (log_size={result.get('log_size')}) "
+                    f"{metric}: {baseline[metric]} -> {result[metric]}")
+    return regressions
+
+
+def main(args: Optional[List[str]] = None) -> int:
+    parser = ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default=",".join(DEFAULT_SIZES),
+                        help="comma-separated total log sizes, i.e. 1MB,2GB")
+    parser.add_argument("--output", default="benchmark_results.json",
+                        help="file to write JSON results to")
+    parser.add_argument("--compare",
+                        help="JSON results of a previous run to compare to")
+    parser.add_argument("--work-dir",
+                        help="directory to write synthetic logs in")
+    args = parser.parse_args(args)
+    results = run_benchmarks([parse_size(s) for s in args.sizes.split(",")],
+                             work_dir=args.work_dir)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare_results(results, json.load(f))
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())